@@ -3,34 +3,62 @@ Main application logic for the Smart YouTube Shorts Clip Generator
 """
 import sys
 import os
+import numpy as np
 from PyQt6.QtWidgets import QApplication, QMessageBox, QFileDialog
-from PyQt6.QtCore import Qt
-from moviepy.video.io.VideoFileClip import VideoFileClip
+from PyQt6.QtCore import Qt, QThreadPool, QTimer
 
-from ui import MainWindow
-from video_analysis import AnalysisThread, SmartBoundaryFinder
-from video_export import ExportThread, ClipGenerator
-from utils import format_time, is_valid_video_file, get_video_info, validate_clip_parameters
+from ui import MainWindow, DARK_QSS, GenMethod, repolish
+from video_probe import ProbeRunnable
+from utils import (format_time, format_clip_labels, parse_time, is_valid_video_file,
+                   video_cache_key, validate_clip_parameters)
 
 
 class VideoClipExtractor(MainWindow):
     """Main application class that combines UI with business logic"""
     
+    PROGRESS_FLUSH_MS = 50
+    
     def __init__(self):
         # Application state
         self.video_path = None
         self.video_duration = 0
-        self.clips = []
-        self.export_thread = None
-        self.analysis_thread = None
+        self.video_meta = {}  # duration, width, height from the load-time probe
+        
+        # Clips as an (N, 2) array of start/end seconds plus a parallel list of names
+        self.clip_times = np.empty((0, 2), dtype=np.float64)
+        self.clip_names = []
+        self.export_task = None
+        self.analysis_task = None
+        self.probe_task = None
+        self._probe_path = None  # File whose probe result is still wanted
         
         # Smart cutting data
         self.scenes = []
         self.speech_boundaries = []
+        self._has_analysis = False
+        
+        # Sorted boundary arrays for vectorized smart cuts
+        self._scene_start_arr = np.zeros(0, dtype=np.float64)
+        self._scene_end_arr = np.zeros(0, dtype=np.float64)
+        self._speech_arr = np.zeros(0, dtype=np.float64)
+        
+        # Analysis results per video file, keyed by (path, mtime, size)
+        self._analysis_cache = {}
+        
+        # One long-lived pool runs analysis and export tasks
+        self.pool = QThreadPool.globalInstance()
+        self.pool.setMaxThreadCount(max(2, (os.cpu_count() or 2) // 2))
         
         # Initialize parent (this creates all UI elements)
         super().__init__()
         
+        # Export progress is stored as it arrives and drawn at most every
+        # PROGRESS_FLUSH_MS, however fast the worker reports
+        self._pending_progress = None
+        self._progress_timer = QTimer(self)
+        self._progress_timer.setInterval(self.PROGRESS_FLUSH_MS)
+        self._progress_timer.timeout.connect(self._flush_progress)
+        
         # Connect UI signals to handlers (after UI is created)
         self._connect_signals()
         
@@ -38,61 +66,83 @@ class VideoClipExtractor(MainWindow):
         """Connect UI signals to their respective handlers"""
         self.drop_zone.file_dropped.connect(self.load_video_file)
         self.generate_btn.clicked.connect(self.generate_clips)
-        self.clear_btn.clicked.connect(self.clear_all_clips)
         self.export_btn.clicked.connect(self.export_clips)
+    
+    def _on_sections_built(self):
+        """Connect the settings and clips widgets, which exist once a file is dropped"""
+        self.clear_btn.clicked.connect(self.clear_all_clips)
         self.analyze_btn.clicked.connect(self.analyze_video)
         self.add_manual_clip_btn.clicked.connect(self.add_manual_clip)
         
         # Connect generation method change to enable/disable smart options
-        self.generation_method.currentTextChanged.connect(self.on_method_changed)
+        self.generation_method.currentIndexChanged.connect(self.on_method_changed)
     
 
     
     def load_video_file(self, file_path):
-        """Load a video file and update UI"""
+        """Load a video file and probe it in the background"""
         if not is_valid_video_file(file_path):
             QMessageBox.warning(self, "Invalid File", "Please select a valid video file!")
             return
-            
-        self.video_path = file_path
         
-        # Reset analysis data
-        self.scenes = []
-        self.speech_boundaries = []
+        # Keep actions disabled until the probe has reported the duration
+        self.analyze_btn.setEnabled(False)
+        self.generate_btn.setEnabled(False)
+        self.manual_start_input.setEnabled(False)
+        self.add_manual_clip_btn.setEnabled(False)
+        self.video_info_label.setText(f"⏳ Inspecting {os.path.basename(file_path)}...")
+        
+        self._probe_path = file_path
+        self.probe_task = ProbeRunnable(file_path)
+        self.probe_task.signals.finished.connect(self._on_probe_done,
+                                                 Qt.ConnectionType.QueuedConnection)
+        self.pool.start(self.probe_task)
+    
+    def _on_probe_done(self, file_path, metadata, error):
+        """Finish loading a video once its metadata is available"""
+        # Ignore results from an earlier drop that has since been replaced
+        if file_path != self._probe_path:
+            return
         
+        if error:
+            self.video_info_label.setText("")
+            QMessageBox.critical(self, "Error", f"Failed to load video: {error}")
+            return
+        
+        self.video_path = file_path
+        self.video_meta = metadata
+        self.video_duration = int(metadata['duration'])
+        
+        # Reset analysis data, restoring it if this exact file was analyzed before
         try:
-            self.video_duration = get_video_info(file_path)
-            
-            # Update video info display
-            filename = os.path.basename(file_path)
-            duration_str = format_time(self.video_duration)
-            self.video_info_label.setText(f"📹 {filename} • {duration_str}")
-            
-            # Enable buttons
-            self.analyze_btn.setEnabled(True)
-            self.generate_btn.setEnabled(True)
-            
-            # Enable manual clip controls
-            self.manual_start_input.setEnabled(True)
-            self.add_manual_clip_btn.setEnabled(True)
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load video: {str(e)}")
+            cached = self._analysis_cache.get(video_cache_key(file_path))
+        except OSError:
+            cached = None
+        self._set_analysis(*(cached or ([], [])))
+        
+        # Update video info display
+        filename = os.path.basename(file_path)
+        duration_str = format_time(self.video_duration)
+        self.video_info_label.setText(f"📹 {filename} • {duration_str}")
+        
+        # Enable buttons
+        self.analyze_btn.setEnabled(True)
+        self.generate_btn.setEnabled(True)
+        
+        # Enable manual clip controls
+        self.manual_start_input.setEnabled(True)
+        self.add_manual_clip_btn.setEnabled(True)
     
     def get_current_mode(self):
-        """Get the current mode based on generation method selection"""
-        method = self.generation_method.currentText()
-        if "Smart" in method:
-            return "Smart"
-        else:
-            return "Random"
+        """Get the current generation method from the combo box"""
+        return GenMethod(self.generation_method.currentIndex())
     
-    def on_method_changed(self, method):
+    def on_method_changed(self, index):
         """Handle generation method change - enable/disable smart options"""
-        is_smart_method = "Smart" in method
+        is_smart_method = index == GenMethod.SMART
         
         # If switched to smart method and no analysis done yet
-        if is_smart_method and self.video_path and not self.scenes and not self.speech_boundaries:
+        if is_smart_method and self.video_path and not self._has_analysis:
             reply = QMessageBox.question(
                 self, "Analysis Required",
                 "Smart detection methods require video analysis.\n\nAnalyze video now?",
@@ -103,10 +153,12 @@ class VideoClipExtractor(MainWindow):
                 self.analyze_video()
             else:
                 # Switch back to Random method
-                self.generation_method.setCurrentText("Random")
+                self.generation_method.setCurrentIndex(GenMethod.RANDOM)
     
     def analyze_video(self):
         """Start video analysis for scenes and speech"""
+        from video_analysis import AnalysisRunnable
+        
         if not self.video_path:
             QMessageBox.warning(self, "No Video", "Please load a video first!")
             return
@@ -120,14 +172,16 @@ class VideoClipExtractor(MainWindow):
         self.progress_bar.setVisible(True)
         self.progress_bar.setMaximum(0)  # Indeterminate
         
-        # Pass analysis options to the thread
+        # Pass analysis options to the task
         analyze_scenes = self.scene_detection_checkbox.isChecked()
         analyze_audio = self.audio_detection_checkbox.isChecked()
         
-        self.analysis_thread = AnalysisThread(self.video_path, analyze_scenes, analyze_audio)
-        self.analysis_thread.progress.connect(self.update_analysis_progress)
-        self.analysis_thread.finished.connect(self.analysis_finished)
-        self.analysis_thread.start()
+        self.analysis_task = AnalysisRunnable(self.video_path, analyze_scenes, analyze_audio,
+                                              analyze_fps=2)
+        self.analysis_task.signals.progress.connect(self.update_analysis_progress)
+        self.analysis_task.signals.finished.connect(self.analysis_finished,
+                                                    Qt.ConnectionType.QueuedConnection)
+        self.pool.start(self.analysis_task)
     
     def update_analysis_progress(self, message):
         """Update analysis progress display"""
@@ -137,50 +191,52 @@ class VideoClipExtractor(MainWindow):
         """Handle analysis completion"""
         self.progress_bar.setVisible(False)
         
+        # A different video was loaded while this one was being analysed
+        if result['video_path'] != self.video_path:
+            self.progress_label.setText("")
+            return
+        
         if result['error']:
             self.progress_label.setText(f"❌ Analysis failed: {result['error']}")
             QMessageBox.warning(self, "Analysis Error", f"Could not analyze video:\n{result['error']}")
             return
         
-        self.scenes = result['scenes']
-        self.speech_boundaries = result['speech_boundaries']
+        self._set_analysis(result['scenes'], result['speech_boundaries'])
+        
+        try:
+            self._analysis_cache[video_cache_key(self.video_path)] = (self.scenes, self.speech_boundaries)
+        except OSError:
+            pass
         
         info = f"✓ Analysis complete: {len(self.scenes)} scenes, {len(self.speech_boundaries)} speech boundaries detected"
         self.progress_label.setText(info)
-        self.progress_label.setStyleSheet("color: #28a745; font-weight: bold;")
+        self.progress_label.setProperty("tone", "success")
+        repolish(self.progress_label)
     
-    def find_smart_boundary(self, time_point, boundary_type='start'):
-        """Find the nearest smart boundary for a cut point"""
-        mode = self.get_current_mode()
-        method = self.generation_method.currentText()
-        
-        # Only apply smart boundaries if using smart method
-        if mode != "Smart":
-            return time_point
-        
-        # Determine priority based on enabled analysis types
+    def _set_analysis(self, scenes, speech_boundaries):
+        """Store analysis results and the sorted arrays used for smart cuts"""
+        # Adopt the worker's arrays directly; lists (e.g. empty defaults) are converted
+        self.scenes = np.asarray(scenes, dtype=np.float64).reshape(-1, 2)
+        self.speech_boundaries = np.asarray(speech_boundaries, dtype=np.float64)
+        self._has_analysis = self.scenes.size > 0 or self.speech_boundaries.size > 0
+        self._scene_start_arr = np.sort(self.scenes[:, 0])
+        self._scene_end_arr = np.sort(self.scenes[:, 1])
+        self._speech_arr = np.sort(self.speech_boundaries)
+    
+    def _get_boundary_priority(self):
+        """Determine boundary priority based on enabled analysis types"""
         if self.scene_detection_checkbox.isChecked() and self.audio_detection_checkbox.isChecked():
-            priority = "Scenes"  # Default to scenes if both are enabled
+            return "Scenes"  # Default to scenes if both are enabled
         elif self.scene_detection_checkbox.isChecked():
-            priority = "Scenes"
+            return "Scenes"
         elif self.audio_detection_checkbox.isChecked():
-            priority = "Speech"
+            return "Speech"
         else:
-            priority = "Scenes"  # Fallback
-        
-        return SmartBoundaryFinder.find_smart_boundary(
-            time_point, self.scenes, self.speech_boundaries,
-            True,  # Enable smart cuts
-            priority,
-            self.max_adjustment_spin.value(),
-            boundary_type
-        )
+            return "Scenes"  # Fallback
     
     def generate_clips(self):
         """Generate clips based on user parameters and selected mode"""
-        if not self.video_path:
-            QMessageBox.warning(self, "No Video", "Please load a video first!")
-            return
+        from video_export import ClipGenerator
         
         mode = self.get_current_mode()
         num_clips = self.num_clips_spin.value()
@@ -188,15 +244,15 @@ class VideoClipExtractor(MainWindow):
         base_name = "short"  # Fixed base name for simplified UI
         allow_overlap = self.allow_overlap_checkbox.isChecked()
         
-        if clip_duration >= self.video_duration:
-            QMessageBox.warning(self, "Invalid Duration", 
-                              f"Clip duration must be less than video duration ({self.video_duration}s)")
-            return
-        
-        # Check if Smart mode is active but no analysis done
-        if mode == "Smart" and not self.scenes and not self.speech_boundaries:
-            QMessageBox.warning(self, "Analysis Required", 
-                              "Smart Cutting mode requires video analysis.\nPlease analyze the video first.")
+        if not self._validate([
+            (lambda: not self.video_path,
+             "No Video", "Please load a video first!"),
+            (lambda: clip_duration >= self.video_duration,
+             "Invalid Duration", f"Clip duration must be less than video duration ({self.video_duration}s)"),
+            # Smart mode needs analysis data to snap to
+            (lambda: mode == GenMethod.SMART and not self._has_analysis,
+             "Analysis Required", "Smart Cutting mode requires video analysis.\nPlease analyze the video first."),
+        ]):
             return
         
         # Generate random clips
@@ -212,105 +268,117 @@ class VideoClipExtractor(MainWindow):
                               f"Could only generate {len(generated_clips)} non-overlapping clips. "
                               f"Try shorter duration, fewer clips, or enable 'Allow Overlapping Clips'.")
         
+        starts = np.fromiter((start for start, _, _ in generated_clips), dtype=np.float64,
+                             count=len(generated_clips))
+        ends = np.fromiter((end for _, end, _ in generated_clips), dtype=np.float64,
+                           count=len(generated_clips))
+        
         # Apply smart boundaries if in Smart mode and analysis data is available
-        if mode == "Smart" and (self.scenes or self.speech_boundaries):
-            adjusted_clips = []
-            for start, end, _ in generated_clips:
-                smart_start = self.find_smart_boundary(start, 'start')
-                smart_end = self.find_smart_boundary(end, 'end')
-                
-                # Ensure valid clip
-                if smart_end > smart_start:
-                    adjusted_clips.append((smart_start, smart_end, ""))
+        if mode == GenMethod.SMART and self._has_analysis:
+            from video_analysis import SmartBoundaryFinder
             
-            generated_clips = adjusted_clips
-        
-        # Clear existing clips and add generated ones
-        self.clips.clear()
-        self.clips_list.clear()
-        
-        for i, (start, end, _) in enumerate(generated_clips, 1):
-            name = f"{base_name}_{i:04d}"
-            self.clips.append((start, end, name))
-            duration = end - start
-            self.clips_list.addItem(
-                f"{name} ({format_time(start)} - {format_time(end)}, {duration:.1f}s)"
-            )
+            priority = self._get_boundary_priority()
+            max_adjustment = self.max_adjustment_spin.value()
+            
+            # Snap all cut points in one vectorized pass
+            starts = SmartBoundaryFinder.find_smart_boundary_batch(
+                starts, self._scene_start_arr, self._speech_arr, priority, max_adjustment, 'start')
+            ends = SmartBoundaryFinder.find_smart_boundary_batch(
+                ends, self._scene_end_arr, self._speech_arr, priority, max_adjustment, 'end')
+            
+            # Ensure valid clips
+            valid = ends > starts
+            starts, ends = starts[valid], ends[valid]
+        
+        # Build names and labels first, then replace the list in one batch
+        names = [f"{base_name}_{i:04d}" for i in range(1, len(starts) + 1)]
+        labels = format_clip_labels(names, starts, ends)
         
+        self.clip_times = np.column_stack((starts, ends))
+        self.clip_names = names
+        
+        self._set_clip_labels(labels)
         self.update_clips_count()
         
-        mode_msg = f" using {mode} mode" if mode == "Smart" else ""
-        self.progress_label.setText(f"✅ Generated {len(generated_clips)} clips{mode_msg}!")
+        mode_msg = " using Smart mode" if mode == GenMethod.SMART else ""
+        self.progress_label.setText(f"✅ Generated {len(names)} clips{mode_msg}!")
         
         # Enable export button if clips were generated
-        if self.clips:
+        if self.clip_names:
             self.export_btn.setEnabled(True)
     
+    def _validate(self, checks):
+        """Run (predicate, title, message) checks in order, warning on the first failure"""
+        for predicate, title, message in checks:
+            if predicate():
+                QMessageBox.warning(self, title, message)
+                return False
+        return True
+    
+    def _set_clip_labels(self, labels):
+        """Replace the clip list contents"""
+        self.clips_model.set_labels(labels)
+    
     def add_manual_clip(self):
         """Add a manual clip based on user input"""
-        if not self.video_path:
-            QMessageBox.warning(self, "No Video", "Please load a video first!")
-            return
-        
         # Get start time from input
         time_text = self.manual_start_input.text().strip()
-        if not time_text:
-            QMessageBox.warning(self, "Invalid Input", "Please enter a start time in MM:SS format!")
-            return
-        
         try:
-            # Parse MM:SS format
-            if ":" in time_text:
-                parts = time_text.split(":")
-                if len(parts) != 2:
-                    raise ValueError("Invalid format")
-                minutes, seconds = int(parts[0]), int(parts[1])
-                start_time = minutes * 60 + seconds
-            else:
-                # Try to parse as seconds only
-                start_time = float(time_text)
-        except (ValueError, IndexError):
-            QMessageBox.warning(self, "Invalid Input", "Please enter time in MM:SS format (e.g., 01:30)!")
+            start_time = parse_time(time_text)
+        except ValueError:
+            start_time = None
+        
+        if not self._validate([
+            (lambda: not self.video_path,
+             "No Video", "Please load a video first!"),
+            (lambda: not time_text,
+             "Invalid Input", "Please enter a start time in MM:SS format!"),
+            (lambda: start_time is None,
+             "Invalid Input", "Please enter time in MM:SS format (e.g., 01:30)!"),
+            # Validate clip bounds
+            (lambda: start_time < 0,
+             "Invalid Time", "Start time cannot be negative!"),
+            (lambda: start_time >= self.video_duration,
+             "Invalid Time",
+             f"Start time cannot be at or beyond video duration ({format_time(self.video_duration)})!"),
+        ]):
             return
         
         # Get clip duration from settings
         clip_duration = self.clip_duration_spin.value()
         end_time = start_time + clip_duration
         
-        # Validate clip bounds
-        if start_time < 0:
-            QMessageBox.warning(self, "Invalid Time", "Start time cannot be negative!")
-            return
-        
-        if start_time >= self.video_duration:
-            QMessageBox.warning(self, "Invalid Time", 
-                              f"Start time cannot be at or beyond video duration ({format_time(self.video_duration)})!")
-            return
-        
         # Auto-adjust end time if it extends beyond video duration
         if end_time > self.video_duration:
             end_time = self.video_duration
         
         # Apply smart boundaries if in Smart mode
         mode = self.get_current_mode()
-        if mode == "Smart" and (self.scenes or self.speech_boundaries):
-            smart_start = self.find_smart_boundary(start_time, 'start')
-            smart_end = self.find_smart_boundary(end_time, 'end')
+        if mode == GenMethod.SMART and self._has_analysis:
+            from video_analysis import SmartBoundaryFinder
+            
+            # Read widget state once for both cut points
+            priority = self._get_boundary_priority()
+            max_adjustment = self.max_adjustment_spin.value()
+            smart_start = SmartBoundaryFinder.find_smart_boundary(
+                start_time, self.scenes, self.speech_boundaries,
+                True, priority, max_adjustment, 'start')
+            smart_end = SmartBoundaryFinder.find_smart_boundary(
+                end_time, self.scenes, self.speech_boundaries,
+                True, priority, max_adjustment, 'end')
             
             # Ensure valid clip after smart adjustment
             if smart_end > smart_start and smart_end <= self.video_duration:
                 start_time, end_time = smart_start, smart_end
         
         # Generate clip name
-        clip_count = len(self.clips) + 1
+        clip_count = len(self.clip_names) + 1
         clip_name = f"manual_{clip_count:04d}"
         
         # Add clip to list
-        self.clips.append((start_time, end_time, clip_name))
-        duration = end_time - start_time
-        self.clips_list.addItem(
-            f"{clip_name} ({format_time(start_time)} - {format_time(end_time)}, {duration:.1f}s)"
-        )
+        self.clip_times = np.vstack((self.clip_times, (start_time, end_time)))
+        self.clip_names.append(clip_name)
+        self.clips_model.append_labels(format_clip_labels([clip_name], [start_time], [end_time]))
         
         self.update_clips_count()
         
@@ -324,18 +392,21 @@ class VideoClipExtractor(MainWindow):
     
     def clear_all_clips(self):
         """Clear all clips from the list"""
-        self.clips.clear()
-        self.clips_list.clear()
+        self.clip_times = np.empty((0, 2), dtype=np.float64)
+        self.clip_names = []
+        self.clips_model.clear()
         self.update_clips_count()
     
     def update_clips_count(self):
         """Update the clips count label"""
-        count = len(self.clips)
+        count = len(self.clip_names)
         self.clips_count_label.setText(f"({count} clip{'s' if count != 1 else ''})")
     
     def export_clips(self):
         """Export all clips to video files"""
-        if not self.clips:
+        from video_export import ExportRunnable
+        
+        if not self.clip_names:
             QMessageBox.warning(self, "No Clips", "Please generate or add at least one clip to export!")
             return
         
@@ -344,21 +415,45 @@ class VideoClipExtractor(MainWindow):
             return
         
         self.progress_bar.setVisible(True)
-        self.progress_bar.setMaximum(len(self.clips))
+        self.progress_bar.setMaximum(len(self.clip_names))
         self.progress_bar.setValue(0)
         
-        self.export_thread = ExportThread(self.video_path, self.clips, output_folder)
-        self.export_thread.progress.connect(self.update_export_progress)
-        self.export_thread.finished.connect(self.export_finished)
-        self.export_thread.start()
+        # Clips are pure time cuts with no filters, so they can be stream-copied unless
+        # frame-accurate cuts were requested; disjoint stream copies can all be split
+        # out of a single FFmpeg run
+        clips = [(start, end, name) for (start, end), name
+                 in zip(self.clip_times.tolist(), self.clip_names)]
+        stream_copy = not self.frame_accurate_checkbox.isChecked()
+        self.export_task = ExportRunnable(self.video_path, clips, output_folder,
+                                          stream_copy=stream_copy,
+                                          single_pass=not ExportRunnable.times_overlap(self.clip_times),
+                                          video_meta=self.video_meta,
+                                          use_hw_encoder=self.hw_encoder_checkbox.isChecked())
+        self.export_task.signals.progress.connect(self.update_export_progress)
+        self.export_task.signals.finished.connect(self.export_finished)
+        self._pending_progress = None
+        self._progress_timer.start()
+        self.pool.start(self.export_task)
     
     def update_export_progress(self, count, message):
-        """Update export progress display"""
-        self.progress_bar.setValue(count)
-        self.progress_label.setText(message)
+        """Record the latest export progress for the next flush"""
+        self._pending_progress = (count, message)
+    
+    def _flush_progress(self):
+        """Draw the latest export progress, skipping unchanged values"""
+        if self._pending_progress is None:
+            return
+        count, message = self._pending_progress
+        self._pending_progress = None
+        if count != self.progress_bar.value():
+            self.progress_bar.setValue(count)
+        if message != self.progress_label.text():
+            self.progress_label.setText(message)
     
     def export_finished(self, success, message):
         """Handle export completion"""
+        self._progress_timer.stop()
+        self._pending_progress = None
         self.progress_bar.setVisible(False)
         self.progress_label.setText("")
         
@@ -371,6 +466,7 @@ class VideoClipExtractor(MainWindow):
 def main():
     """Main entry point"""
     app = QApplication(sys.argv)
+    app.setStyleSheet(DARK_QSS)
     window = VideoClipExtractor()
     window.show()
     sys.exit(app.exec())
@@ -1,64 +1,50 @@
-from moviepy.editor import VideoFileClip, ImageClip, CompositeVideoClip
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
 import numpy as np
+import subprocess
 import os
+from functools import lru_cache
 
 # Ensure export directory exists
 os.makedirs("export", exist_ok=True)
 
-# Load video from input directory
-video = VideoFileClip("input/input.mp4")
+# Read the video size with ffprobe (no decoder needed)
+input_path = "input/input.mp4"
+probe = subprocess.run(
+    ["ffprobe", "-v", "error", "-select_streams", "v:0",
+     "-show_entries", "stream=width,height", "-of", "csv=p=0", input_path],
+    capture_output=True, text=True, check=True)
+video_w, video_h = (int(v) for v in probe.stdout.strip().split(",")[:2])
 
-# Create text image using PIL with rounded box and emoji support
-def create_text_image(text, video_size, font_size=70):
-    # Create a transparent image
-    img = Image.new('RGBA', video_size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    # Try to load fonts - prioritize color emoji fonts
-    font = None
-    emoji_font = None
-    
-    # Regular text font paths
-    text_font_paths = [
-        "C:/Windows/Fonts/arial.ttf",     # Arial
-        "C:/Windows/Fonts/calibri.ttf",   # Calibri
-        "C:/Windows/Fonts/segoeui.ttf",   # Segoe UI
-    ]
-    
-    # Color emoji font paths
-    emoji_font_paths = [
-        "C:/Windows/Fonts/seguiemj.ttf",  # Segoe UI Emoji
-        "C:/Windows/Fonts/NotoColorEmoji.ttf",  # Noto Color Emoji (if installed)
-    ]
-    
-    # Load regular font
-    for font_path in text_font_paths:
-        try:
-            font = ImageFont.truetype(font_path, font_size)
-            break
-        except:
-            continue
-    
-    # Load emoji font
-    for font_path in emoji_font_paths:
+# Regular text font paths
+TEXT_FONT_PATHS = [
+    "C:/Windows/Fonts/arial.ttf",     # Arial
+    "C:/Windows/Fonts/calibri.ttf",   # Calibri
+    "C:/Windows/Fonts/segoeui.ttf",   # Segoe UI
+]
+
+def _load_first_font(font_paths, font_size):
+    for font_path in font_paths:
         try:
-            emoji_font = ImageFont.truetype(font_path, font_size)
-            break
-        except:
+            return ImageFont.truetype(font_path, font_size)
+        except OSError:
             continue
-    
+    return None
+
+@lru_cache(maxsize=16)
+def resolve_font(font_size):
     # Fallback to default if no font found
-    if font is None:
-        font = ImageFont.load_default()
-    if emoji_font is None:
-        emoji_font = font
+    return _load_first_font(TEXT_FONT_PATHS, font_size) or ImageFont.load_default()
+
+# Create text image using PIL with rounded box and emoji support
+def create_text_image(text, video_size, font_size=70):
+    # Fonts are resolved once per size and reused
+    font = resolve_font(font_size)
     
     # Split text into text and emoji parts for better rendering
     import re
     
     # Get text dimensions using the main font
-    bbox = draw.textbbox((0, 0), text, font=font)
+    bbox = font.getbbox(text)
     text_width = bbox[2] - bbox[0]
     text_height = bbox[3] - bbox[1]
     
@@ -71,45 +57,55 @@ def create_text_image(text, video_size, font_size=70):
     box_x = (video_size[0] - box_width) // 2
     box_y = (video_size[1] - box_height) // 2
     
+    # Create a transparent image just big enough for the box
+    img = Image.new('RGBA', (box_width + 1, box_height + 1), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    
     # Draw rounded rectangle background - WHITE container
     corner_radius = 20
     box_color = (255, 255, 255, 220)  # Semi-transparent white
     
     # Create rounded rectangle
     draw.rounded_rectangle(
-        [box_x, box_y, box_x + box_width, box_y + box_height],
+        [0, 0, box_width, box_height],
         radius=corner_radius,
         fill=box_color
     )
     
     # Calculate text position within the box
-    text_x = box_x + padding
-    text_y = box_y + padding
+    text_x = padding
+    text_y = padding
     
     # Draw text with slight outline for better readability - BLACK text
+    # Rasterize the glyphs once and grow them with a max filter for the outline
     outline_width = 1
-    for adj in range(-outline_width, outline_width + 1):
-        for adj2 in range(-outline_width, outline_width + 1):
-            if adj != 0 or adj2 != 0:
-                draw.text((text_x + adj, text_y + adj2), text, font=font, fill='white')
+    text_mask = Image.new('L', img.size, 0)
+    ImageDraw.Draw(text_mask).text((text_x, text_y), text, font=font, fill=255)
+    outline_mask = text_mask.filter(ImageFilter.MaxFilter(2 * outline_width + 1))
+    img.paste((255, 255, 255, 255), mask=outline_mask)
     
     # Draw main text in black
     draw.text((text_x, text_y), text, font=font, fill='black')
     
-    return np.array(img)
-
-# Create text overlay
-text_array = create_text_image("watch till the end 😂", (video.w, video.h))
-txt_clip = ImageClip(text_array, transparent=True, duration=video.duration)
+    return np.array(img), box_x, box_y
 
-# Overlay text on video
-final_video = CompositeVideoClip([video, txt_clip])
+# Render the caption once to a PNG
+text_array, box_x, box_y = create_text_image("watch till the end 😂", (video_w, video_h))
+caption_path = "export/caption.png"
+Image.fromarray(text_array).save(caption_path)
 
-# Write the result to export directory
-final_video.write_videofile("export/output_with_caption.mp4", codec='libx264')
+# Let ffmpeg's overlay filter composite it onto every frame
+subprocess.run([
+    "ffmpeg", "-y",
+    "-i", input_path,
+    "-i", caption_path,
+    "-filter_complex", f"[0:v][1:v]overlay={box_x}:{box_y}",
+    "-c:v", "libx264", "-preset", "ultrafast", "-threads", "4",
+    "-c:a", "copy",
+    "export/output_with_caption.mp4"
+], check=True)
 
 # Clean up
-video.close()
-final_video.close()
+os.remove(caption_path)
 
 print("Video with caption exported successfully to export/output_with_caption.mp4")
\ No newline at end of file
@@ -14,11 +14,26 @@ import argparse
 from scenedetect import VideoManager, SceneManager
 from scenedetect.detectors import ContentDetector
 import os
+import queue
+import threading
 import numpy as np
 from tqdm import tqdm
 
 # --- Constants ---
 ASPECT_RATIO = 9 / 16
+PIPELINE_QUEUE_SIZE = 8  # Frames buffered between the decode/transform/write stages
+TRANSFORM_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))  # Frame loop crop/resize threads
+YOLO_BATCH_SIZE = 16  # Scene midframes per YOLO inference call
+YOLO_IMGSZ = 640  # YOLO input size; midframes are shrunk to this width first
+CASCADE_WIDTH = 640  # Haar fallback runs on frames shrunk to this width
+HEAD_KEYPOINTS = [0, 1, 2, 3, 4]  # COCO nose, eyes, ears
+KEYPOINT_MIN_CONF = 0.5
+FACE_TO_PERSON_HEIGHT = 0.15  # Rough face size relative to the person box
+MAX_FILTER_GRAPH_SCENES = 200  # Above this, fall back to the Python frame loop
+
+# Render plan: one row per scene
+STRATEGY_LETTERBOX, STRATEGY_TRACK = 0, 1
+PLAN_DTYPE = np.dtype([('start', 'i4'), ('end', 'i4'), ('strategy', 'i1'), ('x1', 'i4'), ('x2', 'i4')])
 
 # Global variables for models
 model = None
@@ -36,62 +51,103 @@ def initialize_models():
     try:
         from ultralytics import YOLO
         import torch
-        model = YOLO('yolov8n.pt')
+        # The pose model finds people and their head keypoints in one pass
+        model = YOLO('yolov8n-pose.pt')
         use_yolo = True
-        print("✅ YOLO model loaded successfully")
+        print("✅ YOLO pose model loaded successfully")
     except Exception as e:
         print(f"⚠️  Warning: Could not load YOLO model: {e}")
         print("   Falling back to face detection only mode")
         use_yolo = False
 
-def analyze_scene_content(video_path, scene_start_time, scene_end_time):
+def gather_midframes(video_path, scenes):
     """
-    Analyzes the middle frame of a scene to detect people and faces.
+    Reads the middle frame of every scene with a single VideoCapture.
+    Returns a list aligned with scenes (None where a frame could not be read).
     """
+    frames = [None] * len(scenes)
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         print(f"Error: Could not open video {video_path}")
-        return []
+        return frames
+
+    midframes = []
+    for scene_start_time, scene_end_time in scenes:
+        start_frame = scene_start_time.get_frames()
+        end_frame = scene_end_time.get_frames()
+        midframes.append(int(start_frame + (end_frame - start_frame) / 2))
+
+    # Walk the stream once in order: grab() every frame, but only
+    # retrieve() (convert to BGR) the midframes we need
+    targets = sorted(range(len(scenes)), key=midframes.__getitem__)
+    next_target = 0
+    frame_number = 0
+    while next_target < len(targets) and cap.grab():
+        while next_target < len(targets) and midframes[targets[next_target]] == frame_number:
+            ret, frame = cap.retrieve()
+            if ret:
+                frames[targets[next_target]] = frame
+            next_target += 1
+        frame_number += 1
 
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    
-    start_frame = scene_start_time.get_frames()
-    end_frame = scene_end_time.get_frames()
-    middle_frame_number = int(start_frame + (end_frame - start_frame) / 2)
-    
-    cap.set(cv2.CAP_PROP_POS_FRAMES, middle_frame_number)
-    
-    ret, frame = cap.read()
-    if not ret:
-        cap.release()
-        return []
+    cap.release()
+    return frames
+
+def face_box_from_keypoints(xy, conf, person_box, frame_shape):
+    """
+    Builds a face box around the visible COCO head keypoints (nose, eyes, ears),
+    sized from the person's height. Returns None if no head keypoint is visible.
+    """
+    head = xy[HEAD_KEYPOINTS]
+    visible = (head[:, 0] > 0) & (head[:, 1] > 0)
+    if conf is not None:
+        visible &= conf[HEAD_KEYPOINTS] >= KEYPOINT_MIN_CONF
+    if not visible.any():
+        return None
 
+    center_x, center_y = head[visible].mean(axis=0)
+    half = (person_box[3] - person_box[1]) * FACE_TO_PERSON_HEIGHT / 2
+    return [max(0, int(center_x - half)), max(0, int(center_y - half)),
+            min(frame_shape[1], int(center_x + half)), min(frame_shape[0], int(center_y + half))]
+
+def detect_objects(frame, yolo_result=None, yolo_scale=1.0):
+    """
+    Detects people and faces in one frame, using a YOLO result when available.
+    yolo_scale maps YOLO coordinates back to the frame if it ran on a smaller copy.
+    """
     detected_objects = []
 
-    if use_yolo and model is not None:
-        # Use YOLO for person detection
-        results = model([frame], verbose=False)
-        
-        for result in results:
-            boxes = result.boxes
-            for box in boxes:
-                if box.cls[0] == 0:  # Person class
-                    x1, y1, x2, y2 = [int(i) for i in box.xyxy[0]]
-                    person_box = [x1, y1, x2, y2]
-                    
-                    person_roi_gray = cv2.cvtColor(frame[y1:y2, x1:x2], cv2.COLOR_BGR2GRAY)
-                    faces = face_cascade.detectMultiScale(person_roi_gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
-                    
-                    face_box = None
-                    if len(faces) > 0:
-                        fx, fy, fw, fh = faces[0]
-                        face_box = [x1 + fx, y1 + fy, x1 + fx + fw, y1 + fy + fh]
-
-                    detected_objects.append({'person_box': person_box, 'face_box': face_box})
+    if yolo_result is not None:
+        # Use YOLO pose for person detection; faces come from the head keypoints
+        boxes = yolo_result.boxes
+        keypoints = yolo_result.keypoints
+        for j, box in enumerate(boxes):
+            if box.cls[0] == 0:  # Person class
+                x1, y1, x2, y2 = [int(i * yolo_scale) for i in box.xyxy[0]]
+                person_box = [x1, y1, x2, y2]
+                
+                face_box = None
+                if keypoints is not None:
+                    face_box = face_box_from_keypoints(
+                        keypoints.xy[j].cpu().numpy() * yolo_scale,
+                        None if keypoints.conf is None else keypoints.conf[j].cpu().numpy(),
+                        person_box, frame.shape)
+
+                detected_objects.append({'person_box': person_box, 'face_box': face_box})
     else:
-        # Fallback to face detection only
+        # Fallback to face detection only, on a copy at most CASCADE_WIDTH wide
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
+        cascade_scale = 1.0
+        if gray.shape[1] > CASCADE_WIDTH:
+            cascade_scale = gray.shape[1] / CASCADE_WIDTH
+            gray = cv2.resize(gray, (CASCADE_WIDTH, int(gray.shape[0] / cascade_scale)),
+                              interpolation=cv2.INTER_AREA)
+        # Keep the 30px full-size minimum, but never below the cascade's 24px window
+        min_face = max(24, int(30 / cascade_scale))
+        max_face = int(gray.shape[0] * 0.8)
+        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=5,
+                                              minSize=(min_face, min_face), maxSize=(max_face, max_face))
+        faces = (np.asarray(faces, dtype=np.float64).reshape(-1, 4) * cascade_scale).astype(int).tolist()
         
         for (x, y, w, h) in faces:
             face_box = [x, y, x + w, y + h]
@@ -101,11 +157,40 @@ def analyze_scene_content(video_path, scene_start_time, scene_end_time):
                          min(frame.shape[0], y + h + h*3)]
             detected_objects.append({'person_box': person_box, 'face_box': face_box})
                 
-    cap.release()
     return detected_objects
 
+def analyze_scenes_content(video_path, scenes):
+    """
+    Analyzes the middle frame of every scene to detect people and faces.
+    YOLO runs on the midframes in batches instead of one call per scene.
+    """
+    frames = gather_midframes(video_path, scenes)
+    yolo_results = [None] * len(frames)
+    yolo_scale = 1.0
 
-def detect_scenes(video_path):
+    if use_yolo and model is not None:
+        readable = [i for i, frame in enumerate(frames) if frame is not None]
+        if readable:
+            # YOLO letterboxes to YOLO_IMGSZ anyway; shrinking first keeps its
+            # preprocessing (and the host-to-device copy) small
+            height, width = frames[readable[0]].shape[:2]
+            if width > YOLO_IMGSZ:
+                yolo_scale = width / YOLO_IMGSZ
+            small_size = (int(round(width / yolo_scale)), int(round(height / yolo_scale)))
+        for b in tqdm(range(0, len(readable), YOLO_BATCH_SIZE), desc="Detecting People"):
+            batch = readable[b:b + YOLO_BATCH_SIZE]
+            inputs = [frames[i] if yolo_scale == 1.0 else
+                      cv2.resize(frames[i], small_size, interpolation=cv2.INTER_AREA)
+                      for i in batch]
+            results = model(inputs, imgsz=YOLO_IMGSZ, verbose=False)
+            for i, result in zip(batch, results):
+                yolo_results[i] = result
+
+    return [detect_objects(frame, result, yolo_scale) if frame is not None else []
+            for frame, result in zip(frames, yolo_results)]
+
+
+def detect_scenes(video_path, fps, total_frames):
     # Check if video file exists
     if not os.path.exists(video_path):
         raise FileNotFoundError(f"Video file not found: {video_path}")
@@ -115,37 +200,21 @@ def detect_scenes(video_path):
     
     try:
         # Detect scenes using the newer API
-        scene_list = detect(video_path, ContentDetector())
-        
-        # Get FPS using OpenCV as fallback
-        cap = cv2.VideoCapture(video_path)
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        cap.release()
-        
-        return scene_list, fps
+        return detect(video_path, ContentDetector())
     except Exception as e:
         print(f"Error detecting scenes: {e}")
         # Fallback: treat entire video as one scene
-        cap = cv2.VideoCapture(video_path)
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        cap.release()
-        
-        # Create a single scene for the entire video
         from scenedetect import FrameTimecode
         start_time = FrameTimecode(0, fps=fps)
         end_time = FrameTimecode(total_frames, fps=fps)
-        scene_list = [(start_time, end_time)]
-        
-        return scene_list, fps
+        return [(start_time, end_time)]
 
 def get_enclosing_box(boxes):
     if not boxes:
         return None
-    min_x = min(box[0] for box in boxes)
-    min_y = min(box[1] for box in boxes)
-    max_x = max(box[2] for box in boxes)
-    max_y = max(box[3] for box in boxes)
+    boxes = np.asarray(boxes).reshape(-1, 4)
+    min_x, min_y = boxes[:, :2].min(axis=0).tolist()
+    max_x, max_y = boxes[:, 2:].max(axis=0).tolist()
     return [min_x, min_y, max_x, max_y]
 
 def decide_cropping_strategy(scene_analysis, frame_height):
@@ -164,35 +233,238 @@ def decide_cropping_strategy(scene_analysis, frame_height):
     else:
         return 'LETTERBOX', None
 
+def calculate_crop_boxes(target_boxes, frame_width, frame_height):
+    """
+    Computes the full-height crop columns for an (S, 4) array of target boxes
+    in one vectorized pass. Returns the x1 and x2 arrays.
+    """
+    target_boxes = np.asarray(target_boxes, dtype=np.float64).reshape(-1, 4)
+    crop_width = int(frame_height * ASPECT_RATIO)
+    target_center_x = (target_boxes[:, 0] + target_boxes[:, 2]) / 2
+    x1 = np.trunc(target_center_x - crop_width / 2).astype(np.int64)
+    x2 = np.trunc(target_center_x + crop_width / 2).astype(np.int64)
+    past_left = x1 < 0
+    x1[past_left] = 0
+    x2[past_left] = crop_width
+    past_right = x2 > frame_width
+    x2[past_right] = frame_width
+    x1[past_right] = frame_width - crop_width
+    return x1, x2
+
 def calculate_crop_box(target_box, frame_width, frame_height):
-    target_center_x = (target_box[0] + target_box[2]) / 2
-    crop_height = frame_height
-    crop_width = int(crop_height * ASPECT_RATIO)
-    x1 = int(target_center_x - crop_width / 2)
-    y1 = 0
-    x2 = int(target_center_x + crop_width / 2)
-    y2 = frame_height
-    if x1 < 0:
-        x1 = 0
-        x2 = crop_width
-    if x2 > frame_width:
-        x2 = frame_width
-        x1 = frame_width - crop_width
-    return x1, y1, x2, y2
-
-def get_video_resolution(video_path):
+    x1, x2 = calculate_crop_boxes([target_box], frame_width, frame_height)
+    return int(x1[0]), 0, int(x2[0]), frame_height
+
+def video_encoder_args(use_gpu):
+    """FFmpeg video encoder arguments: NVENC on the GPU, or libx264 on the CPU."""
+    if use_gpu:
+        return ['-c:v', 'h264_nvenc', '-preset', 'p4', '-cq', '23']
+    return ['-c:v', 'libx264', '-preset', 'fast', '-crf', '23']
+
+def build_crop_plan(scenes_analysis, frame_width, frame_height):
+    """
+    Flattens the per-scene analysis into a structured array (one row per scene)
+    with the frame range, strategy and crop columns used by the render step.
+    """
+    plan = np.zeros(len(scenes_analysis), dtype=PLAN_DTYPE)
+    plan['start'] = [scene_data['start_frame'] for scene_data in scenes_analysis]
+    plan['end'] = [scene_data['end_frame'] for scene_data in scenes_analysis]
+    track = np.array([scene_data['strategy'] == 'TRACK' for scene_data in scenes_analysis], dtype=bool)
+    plan['strategy'] = np.where(track, STRATEGY_TRACK, STRATEGY_LETTERBOX)
+    if track.any():
+        crop_x1, crop_x2 = calculate_crop_boxes(
+            [scene_data['target_box'] for scene_data, is_track in zip(scenes_analysis, track) if is_track],
+            frame_width, frame_height)
+        plan['x1'][track] = crop_x1
+        plan['x2'][track] = crop_x2
+    return plan
+
+def build_crop_matrices(plan, frame_height, output_width, output_height):
+    """
+    Inverse affine maps (output pixel -> source pixel) for every scene's crop:
+    x_src = x1 + x_out * crop_width / output_width.
+    """
+    matrices = np.zeros((len(plan), 2, 3), dtype=np.float32)
+    matrices[:, 0, 0] = (plan['x2'] - plan['x1']) / output_width
+    matrices[:, 0, 2] = plan['x1']
+    matrices[:, 1, 1] = frame_height / output_height
+    return matrices
+
+def merge_plan_runs(plan):
+    """
+    Merges back-to-back scenes that get the same transform into one row, so
+    the filter graph needs one branch per run rather than one per scene.
+    """
+    if len(plan) < 2:
+        return plan
+    same = ((plan['strategy'][1:] == plan['strategy'][:-1]) &
+            (plan['x1'][1:] == plan['x1'][:-1]) &
+            (plan['x2'][1:] == plan['x2'][:-1]) &
+            (plan['start'][1:] == plan['end'][:-1]))
+    run_starts = np.flatnonzero(np.concatenate(([True], ~same)))
+    run_ends = np.append(run_starts[1:], len(plan)) - 1
+    merged = plan[run_starts].copy()
+    merged['end'] = plan['end'][run_ends]
+    return merged
+
+def build_filter_graph(plan, frame_width, frame_height, output_width, output_height):
+    """
+    Builds an FFmpeg filter_complex that applies each scene's crop or letterbox
+    to its frame range and concatenates the results into [v].
+    """
+    letterbox_height = int(frame_height * (output_width / frame_width)) // 2 * 2
+    letterbox_y = (output_height - letterbox_height) // 2
+
+    plan = merge_plan_runs(plan)
+    count = len(plan)
+    chains = ["[0:v]split=" + str(count) + "".join(f"[in{i}]" for i in range(count))]
+    for i, (start, end, strategy, x1, x2) in enumerate(plan.tolist()):
+        if strategy == STRATEGY_TRACK:
+            transform = f"crop={x2 - x1}:{frame_height}:{x1}:0,scale={output_width}:{output_height}"
+        else: # LETTERBOX
+            transform = (f"scale={output_width}:{letterbox_height},"
+                         f"pad={output_width}:{output_height}:0:{letterbox_y}:black")
+        chains.append(
+            f"[in{i}]trim=start_frame={start}:end_frame={end},"
+            f"setpts=PTS-STARTPTS,{transform},setsar=1[v{i}]")
+
+    chains.append("".join(f"[v{i}]" for i in range(count)) + f"concat=n={count}:v=1:a=0[v]")
+    return ";".join(chains)
+
+def make_resizer():
+    """
+    Returns resize_into(src, size, dst), which writes the resized image into dst.
+    Uses cv2.cuda when this OpenCV build has a CUDA device, otherwise cv2.resize.
+    """
+    try:
+        has_cuda = cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        has_cuda = False
+
+    if not has_cuda:
+        def resize_into(src, size, dst):
+            cv2.resize(src, size, dst=dst)
+        return resize_into
+
+    print("⚡ Resizing frames on the GPU (cv2.cuda)")
+    # Device buffers are reused for every frame
+    gpu_src = cv2.cuda_GpuMat()
+    gpu_dst = cv2.cuda_GpuMat()
+
+    def resize_into(src, size, dst):
+        gpu_src.upload(np.ascontiguousarray(src))
+        cv2.cuda.resize(gpu_src, size, dst=gpu_dst)
+        gpu_dst.download(dst=dst)
+    return resize_into
+
+def read_frames(cap, read_q, workers):
+    """Pipeline stage 1: decode (index, frame) pairs into read_q, then one None per worker."""
+    try:
+        frame_number = 0
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            read_q.put((frame_number, frame))
+            frame_number += 1
+    finally:
+        for _ in range(workers):
+            read_q.put(None)
+
+def transform_frames(read_q, write_q, free_q, plan, crop_matrices, frame_to_scene,
+                     output_size, letterbox_height, letterbox_y, letterboxed):
+    """
+    Pipeline stage 2 (one or more threads): crop or letterbox each frame into a
+    recycled buffer. The heavy work is cv2 calls, which release the GIL.
+    """
+    output_width, output_height = output_size
+    resize_into = make_resizer()  # Per worker, so GPU buffers are never shared
+    # Plain lists index faster than NumPy scalars in the per-frame path
+    is_track = (plan['strategy'] == STRATEGY_TRACK).tolist()
+    needs_resize = ((plan['x2'] - plan['x1']) != output_width).tolist()
+    crop_x1 = plan['x1'].tolist()
+    crop_x2 = plan['x2'].tolist()
+    crop_matrices = list(crop_matrices)
+    frame_to_scene = frame_to_scene.tolist()
+    last_scene = len(plan) - 1
+    while True:
+        # Take a buffer before a frame, so the frame the writer is waiting
+        # for always has somewhere to go
+        output_frame = free_q.get()
+        item = read_q.get()
+        if item is None:
+            free_q.put(output_frame)
+            break
+        frame_number, frame = item
+
+        # The reported frame count can be short; extra frames stay in the last scene
+        scene = frame_to_scene[frame_number] if frame_number < len(frame_to_scene) else last_scene
+
+        if is_track[scene]:
+            if needs_resize[scene]:
+                # Crop and scale in one pass over only the cropped columns
+                cv2.warpAffine(frame, crop_matrices[scene], (output_width, output_height),
+                               dst=output_frame, flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP)
+            else:
+                np.copyto(output_frame, frame[:, crop_x1[scene]:crop_x2[scene]])
+            letterboxed.discard(id(output_frame))
+        else: # LETTERBOX
+            if id(output_frame) not in letterboxed:
+                output_frame[:letterbox_y] = 0
+                output_frame[letterbox_y + letterbox_height:] = 0
+                letterboxed.add(id(output_frame))
+            resize_into(frame, (output_width, letterbox_height),
+                        output_frame[letterbox_y:letterbox_y + letterbox_height])
+
+        write_q.put((frame_number, output_frame))
+
+def write_frames(stdin, write_q, free_q, pbar=None):
+    """
+    Pipeline stage 3: pipe frames from write_q to FFmpeg until the None sentinel.
+    Frames arriving out of order are held until their turn. Each buffer is
+    written without copying and then handed back via free_q.
+    """
+    failed = False
+    pending = {}
+    next_frame = 0
+    while True:
+        item = write_q.get()
+        if item is None:
+            break
+        pending[item[0]] = item[1]
+        while next_frame in pending:
+            frame = pending.pop(next_frame)
+            if not failed:
+                try:
+                    stdin.write(frame.data)
+                except (BrokenPipeError, OSError):
+                    failed = True  # FFmpeg exited; its stderr explains why
+            # Keep recycling after a failure so the transform stage never blocks
+            free_q.put(frame)
+            next_frame += 1
+            if pbar is not None:
+                pbar.update(1)
+
+def probe_video(video_path):
+    """Reads (fps, width, height, total_frames) with a single VideoCapture open."""
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         raise IOError(f"Could not open video file {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS)
     width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
     cap.release()
-    return width, height
+    return fps, width, height, total_frames
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Smartly crops a horizontal video into a vertical one.")
     parser.add_argument('-i', '--input', type=str, required=True, help="Path to the input video file.")
     parser.add_argument('-o', '--output', type=str, required=True, help="Path to the output video file.")
+    parser.add_argument('--gpu', action='store_true',
+                        help="Encode with NVENC (h264_nvenc); the filter-graph path also decodes with NVDEC (-hwaccel cuda).")
+    parser.add_argument('--frame-loop', action='store_true',
+                        help="Crop frames in Python and pipe them to FFmpeg instead of using an FFmpeg filter graph.")
     args = parser.parse_args()
 
     # Initialize models with error handling
@@ -224,9 +496,12 @@ if __name__ == '__main__':
     if os.path.exists(temp_audio_output): os.remove(temp_audio_output)
     if os.path.exists(final_output_video): os.remove(final_output_video)
 
+    # Video properties are read once and reused by every step
+    fps, original_width, original_height, total_frames = probe_video(input_video)
+
     print("🎬 Step 1: Detecting scenes...")
     step_start_time = time.time()
-    scenes, fps = detect_scenes(input_video)
+    scenes = detect_scenes(input_video, fps, total_frames)
     step_end_time = time.time()
     
     if not scenes:
@@ -240,7 +515,6 @@ if __name__ == '__main__':
 
     print("\n🧠 Step 2: Analyzing scene content and determining strategy...")
     step_start_time = time.time()
-    original_width, original_height = get_video_resolution(input_video)
     
     OUTPUT_HEIGHT = original_height
     OUTPUT_WIDTH = int(OUTPUT_HEIGHT * ASPECT_RATIO)
@@ -248,8 +522,8 @@ if __name__ == '__main__':
         OUTPUT_WIDTH += 1
 
     scenes_analysis = []
-    for i, (start_time, end_time) in enumerate(tqdm(scenes, desc="Analyzing Scenes")):
-        analysis = analyze_scene_content(input_video, start_time, end_time)
+    all_analysis = analyze_scenes_content(input_video, scenes)
+    for (start_time, end_time), analysis in zip(scenes, all_analysis):
         strategy, target_box = decide_cropping_strategy(analysis, original_height)
         scenes_analysis.append({
             'start_frame': start_time.get_frames(),
@@ -258,6 +532,8 @@ if __name__ == '__main__':
             'strategy': strategy,
             'target_box': target_box
         })
+    # Flat per-scene arrays for the render step
+    plan = build_crop_plan(scenes_analysis, original_width, original_height)
     step_end_time = time.time()
     print(f"✅ Scene analysis complete in {step_end_time - step_start_time:.2f}s.")
 
@@ -269,99 +545,129 @@ if __name__ == '__main__':
         end_time = scenes[i][1].get_timecode()
         print(f"  - Scene {i+1} ({start_time} -> {end_time}): Found {num_people} person(s). Strategy: {strategy}")
 
-    print("\n✂️ Step 4: Processing video frames...")
-    step_start_time = time.time()
+    # Very long scene lists make an unwieldy graph, so those keep the frame loop
+    use_filter_graph = not args.frame_loop and len(merge_plan_runs(plan)) <= MAX_FILTER_GRAPH_SCENES
+
+    if use_filter_graph:
+        print("\n✂️ Step 4: Cropping and encoding with an FFmpeg filter graph...")
+        step_start_time = time.time()
+        filter_graph = build_filter_graph(plan, original_width, original_height,
+                                          OUTPUT_WIDTH, OUTPUT_HEIGHT)
+        command = [
+            'ffmpeg', '-y', '-v', 'error',
+            *(['-hwaccel', 'cuda'] if args.gpu else []),  # Decoded frames come back for the filters
+            '-i', input_video,
+            '-filter_complex', filter_graph,
+            '-map', '[v]', '-map', '0:a?',
+            *video_encoder_args(args.gpu),
+            '-c:a', 'copy', final_output_video
+        ]
+        try:
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except subprocess.CalledProcessError as e:
+            print("\n❌ FFmpeg filter graph processing failed.")
+            print("Stderr:", e.stderr.decode())
+            exit()
+        step_end_time = time.time()
+        print(f"✅ Video and audio written in {step_end_time - step_start_time:.2f}s.")
+    else:
+        print("\n✂️ Step 4: Processing video frames...")
+        step_start_time = time.time()
     
-    command = [
-        'ffmpeg', '-y', '-f', 'rawvideo', '-vcodec', 'rawvideo',
-        '-s', f'{OUTPUT_WIDTH}x{OUTPUT_HEIGHT}', '-pix_fmt', 'bgr24',
-        '-r', str(fps), '-i', '-', '-c:v', 'libx264',
-        '-preset', 'fast', '-crf', '23', '-an', temp_video_output
-    ]
+        command = [
+            'ffmpeg', '-y', '-f', 'rawvideo', '-vcodec', 'rawvideo',
+            '-s', f'{OUTPUT_WIDTH}x{OUTPUT_HEIGHT}', '-pix_fmt', 'bgr24',
+            '-r', str(fps), '-i', '-', *video_encoder_args(args.gpu),
+            '-an', temp_video_output
+        ]
 
-    ffmpeg_process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        ffmpeg_process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
 
-    cap = cv2.VideoCapture(input_video)
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap = cv2.VideoCapture(input_video)
     
-    frame_number = 0
-    current_scene_index = 0
+        # Scene index for every frame, looked up directly in the loop
+        frame_to_scene = np.maximum(
+            np.searchsorted(plan['start'], np.arange(total_frames), side='right') - 1, 0)
+        crop_matrices = build_crop_matrices(plan, original_height, OUTPUT_WIDTH, OUTPUT_HEIGHT)
     
-    with tqdm(total=total_frames, desc="Applying Plan") as pbar:
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            if current_scene_index < len(scenes_analysis) - 1 and \
-               frame_number >= scenes_analysis[current_scene_index + 1]['start_frame']:
-                current_scene_index += 1
-
-            scene_data = scenes_analysis[current_scene_index]
-            strategy = scene_data['strategy']
-            target_box = scene_data['target_box']
-
-            if strategy == 'TRACK':
-                crop_box = calculate_crop_box(target_box, original_width, original_height)
-                processed_frame = frame[crop_box[1]:crop_box[3], crop_box[0]:crop_box[2]]
-                output_frame = cv2.resize(processed_frame, (OUTPUT_WIDTH, OUTPUT_HEIGHT))
-            else: # LETTERBOX
-                scale_factor = OUTPUT_WIDTH / original_width
-                scaled_height = int(original_height * scale_factor)
-                scaled_frame = cv2.resize(frame, (OUTPUT_WIDTH, scaled_height))
-                
-                output_frame = np.zeros((OUTPUT_HEIGHT, OUTPUT_WIDTH, 3), dtype=np.uint8)
-                y_offset = (OUTPUT_HEIGHT - scaled_height) // 2
-                output_frame[y_offset:y_offset + scaled_height, :] = scaled_frame
-            
-            ffmpeg_process.stdin.write(output_frame.tobytes())
-            frame_number += 1
-            pbar.update(1)
+        # Decode, transform and pipe writes run on their own threads so they overlap
+        read_q = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        write_q = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        # Output frames are rendered into a fixed set of buffers that cycle
+        # transform -> write_q -> writer -> free_q, so nothing is allocated per frame
+        free_q = queue.Queue()
+        for _ in range(PIPELINE_QUEUE_SIZE + 2 + TRANSFORM_WORKERS):
+            free_q.put(np.empty((OUTPUT_HEIGHT, OUTPUT_WIDTH, 3), dtype=np.uint8))
+        # Letterbox geometry is the same for every frame
+        letterbox_height = int(original_height * (OUTPUT_WIDTH / original_width))
+        letterbox_y = (OUTPUT_HEIGHT - letterbox_height) // 2
+        # Buffers whose black bars are still intact from an earlier letterboxed frame
+        letterboxed = set()
     
-    ffmpeg_process.stdin.close()
-    stderr_output = ffmpeg_process.stderr.read().decode()
-    ffmpeg_process.wait()
-    cap.release()
-
-    if ffmpeg_process.returncode != 0:
-        print("\n❌ FFmpeg frame processing failed.")
-        print("Stderr:", stderr_output)
-        exit()
-    step_end_time = time.time()
-    print(f"✅ Video processing complete in {step_end_time - step_start_time:.2f}s.")
-
-    print("\n🔊 Step 5: Extracting original audio...")
-    step_start_time = time.time()
-    audio_extract_command = [
-        'ffmpeg', '-y', '-i', input_video, '-vn', '-acodec', 'copy', temp_audio_output
-    ]
-    try:
-        subprocess.run(audio_extract_command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
-        step_end_time = time.time()
-        print(f"✅ Audio extracted in {step_end_time - step_start_time:.2f}s.")
-    except subprocess.CalledProcessError as e:
-        print("\n❌ Audio extraction failed.")
-        print("Stderr:", e.stderr.decode())
-        exit()
+        with tqdm(total=total_frames, desc="Applying Plan") as pbar:
+            reader = threading.Thread(target=read_frames, args=(cap, read_q, TRANSFORM_WORKERS), daemon=True)
+            writer = threading.Thread(target=write_frames, args=(ffmpeg_process.stdin, write_q, free_q, pbar),
+                                      daemon=True)
+            transformers = [
+                threading.Thread(target=transform_frames, daemon=True, args=(
+                    read_q, write_q, free_q, plan, crop_matrices, frame_to_scene,
+                    (OUTPUT_WIDTH, OUTPUT_HEIGHT), letterbox_height, letterbox_y, letterboxed))
+                for _ in range(TRANSFORM_WORKERS)
+            ]
+            reader.start()
+            writer.start()
+            for transformer in transformers:
+                transformer.start()
+    
+            reader.join()
+            for transformer in transformers:
+                transformer.join()
+            write_q.put(None)
+            writer.join()
+        ffmpeg_process.stdin.close()
+        stderr_output = ffmpeg_process.stderr.read().decode()
+        ffmpeg_process.wait()
+        cap.release()
 
-    print("\n✨ Step 6: Merging video and audio...")
-    step_start_time = time.time()
-    merge_command = [
-        'ffmpeg', '-y', '-i', temp_video_output, '-i', temp_audio_output,
-        '-c:v', 'copy', '-c:a', 'copy', final_output_video
-    ]
-    try:
-        subprocess.run(merge_command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if ffmpeg_process.returncode != 0:
+            print("\n❌ FFmpeg frame processing failed.")
+            print("Stderr:", stderr_output)
+            exit()
         step_end_time = time.time()
-        print(f"✅ Final video merged in {step_end_time - step_start_time:.2f}s.")
-    except subprocess.CalledProcessError as e:
-        print("\n❌ Final merge failed.")
-        print("Stderr:", e.stderr.decode())
-        exit()
-
-    # Clean up temp files
-    os.remove(temp_video_output)
-    os.remove(temp_audio_output)
+        print(f"✅ Video processing complete in {step_end_time - step_start_time:.2f}s.")
+
+        print("\n🔊 Step 5: Extracting original audio...")
+        step_start_time = time.time()
+        audio_extract_command = [
+            'ffmpeg', '-y', '-i', input_video, '-vn', '-acodec', 'copy', temp_audio_output
+        ]
+        try:
+            subprocess.run(audio_extract_command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            step_end_time = time.time()
+            print(f"✅ Audio extracted in {step_end_time - step_start_time:.2f}s.")
+        except subprocess.CalledProcessError as e:
+            print("\n❌ Audio extraction failed.")
+            print("Stderr:", e.stderr.decode())
+            exit()
+
+        print("\n✨ Step 6: Merging video and audio...")
+        step_start_time = time.time()
+        merge_command = [
+            'ffmpeg', '-y', '-i', temp_video_output, '-i', temp_audio_output,
+            '-c:v', 'copy', '-c:a', 'copy', final_output_video
+        ]
+        try:
+            subprocess.run(merge_command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            step_end_time = time.time()
+            print(f"✅ Final video merged in {step_end_time - step_start_time:.2f}s.")
+        except subprocess.CalledProcessError as e:
+            print("\n❌ Final merge failed.")
+            print("Stderr:", e.stderr.decode())
+            exit()
+
+        # Clean up temp files
+        os.remove(temp_video_output)
+        os.remove(temp_audio_output)
 
     script_end_time = time.time()
     print(f"\n🎉 All done! Final video saved to {final_output_video}")
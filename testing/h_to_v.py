@@ -1,24 +1,40 @@
-# pip install opencv-python moviepy imageio-ffmpeg numpy
+# pip install opencv-python numpy   (ffmpeg must be on PATH)
 
 import cv2
 import numpy as np
-import os
+import subprocess
 from pathlib import Path
-from moviepy.editor import VideoFileClip
+
+BLUR_DOWNSCALE = 4  # Blur at 1/4 size; the background is out of focus anyway
+BLUR_KERNEL = 51 // BLUR_DOWNSCALE | 1  # Same visual radius as 51x51 at full size
+
+BG_THUMB_SIZE = (32, 18)  # Thumbnail used to detect shot changes
+BG_REFRESH_DIFF = 8  # Mean absolute thumbnail difference that triggers a new background
+
+def _blur(image, ksize):
+    """stackBlur (OpenCV >= 4.7) is much cheaper than GaussianBlur at large radii."""
+    if hasattr(cv2, 'stackBlur'):
+        return cv2.stackBlur(image, (ksize, ksize))
+    return cv2.GaussianBlur(image, (ksize, ksize), 0)
 
 def create_blurred_background(frame, target_width, target_height):
     """Create blurred background filling target aspect."""
-    blurred = cv2.GaussianBlur(frame, (51, 51), 0)
     h, w = frame.shape[:2]
     scale = max(target_width / w, target_height / h)
-    new_w, new_h = int(w * scale), int(h * scale)
-    resized = cv2.resize(blurred, (new_w, new_h))
-    start_x = (new_w - target_width) // 2
-    start_y = (new_h - target_height) // 2
-    return resized[start_y:start_y + target_height, start_x:start_x + target_width]
-
-def convert_horizontal_to_vertical(input_path, temp_output_path, use_blur=True):
-    """Convert horizontal video to vertical 9:16 AVI (no audio)."""
+    # Crop the part of the source that survives the center crop first
+    crop_w = min(w, int(round(target_width / scale)))
+    crop_h = min(h, int(round(target_height / scale)))
+    start_x = (w - crop_w) // 2
+    start_y = (h - crop_h) // 2
+    cropped = frame[start_y:start_y + crop_h, start_x:start_x + crop_w]
+    # Blur a small copy, then scale straight to the target size
+    small = cv2.resize(cropped, (max(1, crop_w // BLUR_DOWNSCALE), max(1, crop_h // BLUR_DOWNSCALE)),
+                       interpolation=cv2.INTER_AREA)
+    blurred = _blur(small, BLUR_KERNEL)
+    return cv2.resize(blurred, (target_width, target_height), interpolation=cv2.INTER_LINEAR)
+
+def convert_horizontal_to_vertical(input_path, output_path, use_blur=True):
+    """Convert horizontal video to vertical 9:16 MP4, copying the original audio."""
     cap = cv2.VideoCapture(input_path)
     if not cap.isOpened():
         print(f"Error: cannot open {input_path}")
@@ -34,65 +50,74 @@ def convert_horizontal_to_vertical(input_path, temp_output_path, use_blur=True):
     target_w = int(target_h * 9/16)
     if target_w > 1080:
         target_w, target_h = 1080, 1920
+    # libx264 with yuv420p needs even dimensions
+    target_w -= target_w % 2
+    target_h -= target_h % 2
     print(f"Output {target_w}x{target_h}")
 
-    if os.path.exists(temp_output_path):
-        os.remove(temp_output_path)
-
-    codecs = [
-        ('MJPG', cv2.VideoWriter_fourcc(*'MJPG')),
-        ('XVID', cv2.VideoWriter_fourcc(*'XVID')),
-        ('DIVX', cv2.VideoWriter_fourcc(*'DIVX')),
+    # Frames go straight into one ffmpeg process that also copies the
+    # original audio, so there is no temp file and no second encode
+    command = [
+        'ffmpeg', '-y', '-v', 'error',
+        '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+        '-s', f'{target_w}x{target_h}', '-r', str(fps),
+        '-i', '-',
+        '-i', input_path,
+        '-map', '0:v', '-map', '1:a?',
+        '-c:v', 'libx264', '-pix_fmt', 'yuv420p',
+        '-c:a', 'copy',
+        '-shortest',
+        output_path
     ]
-    out = None
-    for name, fourcc in codecs:
-        out = cv2.VideoWriter(temp_output_path, fourcc, fps, (target_w, target_h), True)
-        if out.isOpened():
-            print(f"Using codec {name}")
-            break
-        else:
-            out.release()
-            out = None
-    if not out or not out.isOpened():
-        print("Error: could not open any video writer.")
+    try:
+        ffmpeg_process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        print("Error: ffmpeg not found on PATH.")
         cap.release()
         return False
 
     frame_idx = 0
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        if use_blur:
-            bg = create_blurred_background(frame, target_w, target_h)
-        else:
-            bg = np.zeros((target_h, target_w, 3), np.uint8)
-        scale = min(target_w / w, target_h / h)
-        new_w, new_h = int(w * scale), int(h * scale)
-        scaled = cv2.resize(frame, (new_w, new_h))
-        x = (target_w - new_w) // 2
-        y = (target_h - new_h) // 2
-        bg[y:y + new_h, x:x + new_w] = scaled
-        out.write(np.ascontiguousarray(bg, np.uint8))
-        frame_idx += 1
-        if frame_idx % 30 == 0:
-            print(f"{frame_idx}/{frames} frames processed")
-
-    cap.release()
-    out.release()
-    print(f"Video written to {temp_output_path}")
-    return True
+    bg_cache = None  # Blurred background, reused until the shot changes
+    last_thumb = None
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if use_blur:
+                # Within one shot the blurred background barely changes; only
+                # rebuild it when a tiny thumbnail differs noticeably
+                thumb = cv2.resize(frame, BG_THUMB_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+                if bg_cache is None or np.abs(thumb - last_thumb).mean() > BG_REFRESH_DIFF:
+                    bg_cache = create_blurred_background(frame, target_w, target_h)
+                    last_thumb = thumb
+                bg = bg_cache.copy()
+            else:
+                bg = np.zeros((target_h, target_w, 3), np.uint8)
+            scale = min(target_w / w, target_h / h)
+            new_w, new_h = int(w * scale), int(h * scale)
+            scaled = cv2.resize(frame, (new_w, new_h))
+            x = (target_w - new_w) // 2
+            y = (target_h - new_h) // 2
+            bg[y:y + new_h, x:x + new_w] = scaled
+            ffmpeg_process.stdin.write(np.ascontiguousarray(bg, np.uint8).data)
+            frame_idx += 1
+            if frame_idx % 30 == 0:
+                print(f"{frame_idx}/{frames} frames processed")
+    except BrokenPipeError:
+        pass  # ffmpeg exited early; its stderr is reported below
+    finally:
+        cap.release()
+        ffmpeg_process.stdin.close()
 
-def attach_audio(original_video, silent_video, output_with_audio):
-    """Attach original audio track using MoviePy (uses bundled ffmpeg)."""
-    orig = VideoFileClip(original_video)
-    silent = VideoFileClip(silent_video)
-    if orig.audio is None:
-        print("No audio track found in original.")
-        silent.write_videofile(output_with_audio, codec='libx264', audio=False)
-        return
-    final = silent.set_audio(orig.audio)
-    final.write_videofile(output_with_audio, codec='libx264', audio_codec='aac')
+    stderr_output = ffmpeg_process.stderr.read().decode()
+    if ffmpeg_process.wait() != 0:
+        print("Error: ffmpeg failed.")
+        print(stderr_output)
+        return False
+
+    print(f"Video written to {output_path}")
+    return True
 
 def main():
     # Configuration: Set to False for black background, True for blurred background
@@ -101,7 +126,6 @@ def main():
     input_dir = Path("input")
     output_dir = Path("export")
     input_file = input_dir / "input.mp4"
-    temp_output = output_dir / "vertical_temp.avi"
     final_output = output_dir / "vertical_output_with_audio.mp4"
 
     input_dir.mkdir(exist_ok=True)
@@ -113,19 +137,12 @@ def main():
 
     background_type = "blurred" if USE_BLURRED_BACKGROUND else "black"
     print(f"Converting {input_file} to vertical format with {background_type} background...")
-    success = convert_horizontal_to_vertical(str(input_file), str(temp_output), use_blur=USE_BLURRED_BACKGROUND)
+    success = convert_horizontal_to_vertical(str(input_file), str(final_output), use_blur=USE_BLURRED_BACKGROUND)
     if not success:
         print("Conversion failed.")
         return
 
-    print("Attaching audio...")
-    attach_audio(str(input_file), str(temp_output), str(final_output))
     print(f"Final video saved to {final_output}")
-    
-    # Clean up temporary file
-    if temp_output.exists():
-        temp_output.unlink()
-        print(f"Cleaned up temporary file: {temp_output}")
 
 if __name__ == "__main__":
     main()
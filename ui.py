@@ -1,99 +1,258 @@
 """
 Modern Dark UI for Smart YouTube Shorts Clip Generator
 """
+import os
+from enum import IntEnum
+from functools import lru_cache
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QPushButton, QLabel, QSpinBox, QDoubleSpinBox,
-                             QListWidget, QLineEdit, QProgressBar, QFrame,
+                             QListView, QLineEdit, QProgressBar, QFrame,
                              QCheckBox, QComboBox, QFileDialog, QAbstractSpinBox,
-                             QTabWidget)
-from PyQt6.QtCore import Qt, pyqtSignal, QRegularExpression
-from PyQt6.QtGui import QFont, QDragEnterEvent, QDropEvent, QPalette, QColor, QRegularExpressionValidator
+                             QTabWidget, QFormLayout, QGridLayout)
+from PyQt6.QtCore import (Qt, pyqtSignal, QRegularExpression, QTimer, QAbstractListModel,
+                          QModelIndex)
+from PyQt6.QtGui import (QFont, QDragEnterEvent, QDropEvent, QRegularExpressionValidator,
+                         QIcon, QPainter, QPixmap)
+
+
+# Stylesheets live next to this module
+STYLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "styles")
+
+
+def load_stylesheet(name):
+    """Read a QSS file from the styles folder"""
+    with open(os.path.join(STYLES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+# Dark theme, installed once on the QApplication so every window shares it
+DARK_QSS = load_stylesheet("dark.qss")
+
+
+
+class GenMethod(IntEnum):
+    """Clip generation methods, in the order shown in the method combo box"""
+    RANDOM = 0
+    SMART = 1
+
+
+GEN_METHOD_LABELS = {
+    GenMethod.RANDOM: "Random",
+    GenMethod.SMART: "Smart Detection",
+}
+
+
+def repolish(widget):
+    """Re-apply the global stylesheet after a property used by a selector changes"""
+    widget.style().unpolish(widget)
+    widget.style().polish(widget)
+
+
+def _style_button(button, role, large=False):
+    """Tag a button for the [role]/[large] button rules in the global stylesheet"""
+    button.setProperty("role", role)
+    button.setProperty("large", large)
+
+
+
+def _row_grid(widgets, spacing=20):
+    """Lay widgets out left to right in one grid row, with the slack in a trailing column"""
+    grid = QGridLayout()
+    grid.setHorizontalSpacing(spacing)
+    for column, widget in enumerate(widgets):
+        grid.addWidget(widget, 0, column)
+    grid.setColumnStretch(len(widgets), 1)
+    return grid
+
+
+@lru_cache(maxsize=None)
+def _font(family, size, bold=False):
+    """Shared QFont per (family, size, weight); only call once a QApplication exists"""
+    return QFont(family, size, QFont.Weight.Bold if bold else QFont.Weight.Normal)
+
+
+
+@lru_cache(maxsize=None)
+def _emoji_pixmap(emoji, size):
+    """Render an emoji glyph once into a size x size pixmap"""
+    pixmap = QPixmap(size, size)
+    pixmap.fill(Qt.GlobalColor.transparent)
+    font = QFont()
+    font.setPixelSize(int(size * 0.8))
+    painter = QPainter(pixmap)
+    painter.setFont(font)
+    painter.drawText(pixmap.rect(), Qt.AlignmentFlag.AlignCenter, emoji)
+    painter.end()
+    return pixmap
+
+
+@lru_cache(maxsize=None)
+def _emoji_icon(emoji, size=16):
+    """Emoji as a cached QIcon, so buttons draw a pixmap instead of shaping text on each paint"""
+    return QIcon(_emoji_pixmap(emoji, size))
+
+
+class _DummyInput:
+    """Stand-in for a removed text input with a fixed value"""
+    __slots__ = ('_text',)
+    
+    def __init__(self, text):
+        self._text = text
+    
+    def text(self): return self._text
+    def setText(self, text): pass
+
+
+class _DummySpin:
+    """Stand-in for a removed spin box with a fixed value"""
+    __slots__ = ('_value',)
+    
+    def __init__(self, value):
+        self._value = value
+    
+    def setMaximum(self, val): pass
+    def setValue(self, val): pass
+    def setEnabled(self, enabled): pass
+    def value(self): return self._value
+
+
+class _TimeInputWrapper:
+    """Spin-box-like view of the MM:SS manual start input"""
+    __slots__ = ('time_input',)
+    
+    def __init__(self, time_input):
+        self.time_input = time_input
+    
+    def setMaximum(self, val):
+        pass  # Not needed for time input
+    
+    def value(self):
+        """Convert MM:SS format to seconds"""
+        time_text = self.time_input.text()
+        try:
+            if ":" in time_text:
+                minutes, seconds = time_text.split(":")
+                return int(minutes) * 60 + int(seconds)
+            else:
+                return 0
+        except (ValueError, IndexError):
+            return 0
+
+
+# Shared instances behind the compatibility attributes
+_BASE_NAME_INPUT = _DummyInput("short")
+_CLIP_NAME_INPUT = _DummyInput("")
+_END_SPIN = _DummySpin(60)
+_MAX_ADJUSTMENT_SPIN = _DummySpin(2.0)
+
+
+
+class ClipListModel(QAbstractListModel):
+    """Clip list rows as a plain list of display labels"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._labels = []
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._labels)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid():
+            return self._labels[index.row()]
+        return None
+    
+    def set_labels(self, labels):
+        """Replace every row"""
+        self.beginResetModel()
+        self._labels = list(labels)
+        self.endResetModel()
+    
+    def append_labels(self, labels):
+        """Append rows at the end"""
+        if not labels:
+            return
+        first = len(self._labels)
+        self.beginInsertRows(QModelIndex(), first, first + len(labels) - 1)
+        self._labels.extend(labels)
+        self.endInsertRows()
+    
+    def clear(self):
+        """Remove every row"""
+        self.set_labels([])
 
 
 class DropZone(QFrame):
     """Custom drop zone widget for file uploads"""
     file_dropped = pyqtSignal(str)
     
+    FILE_FILTER = "Video Files (*.mp4 *.avi *.mov *.mkv *.wmv *.flv *.webm)"
+    
     def __init__(self):
         super().__init__()
         self.setAcceptDrops(True)
         self.setMinimumHeight(80)
         self.setFrameStyle(QFrame.Shape.Box)
         self.setLineWidth(2)
-        self.setStyleSheet("""
-            QFrame {
-                border: 2px dashed #555;
-                border-radius: 10px;
-                background-color: #2a2a2a;
-                color: #ccc;
-            }
-            QFrame:hover {
-                border-color: #007acc;
-                background-color: #333;
-            }
-        """)
+        # Styled by the #dropzone rules in the global sheet; events only
+        # switch the "state" property
+        self.setObjectName("dropzone")
+        self.setProperty("state", "idle")
+        self.setAttribute(Qt.WidgetAttribute.WA_StyledBackground, True)
+        # Restored when a drag leaves, so a loaded file keeps its look
+        self._state_before_drag = "idle"
+        # Browse dialog, created on first click and reused
+        self._file_dialog = None
         
         layout = QVBoxLayout()
         layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
-        self.icon_label = QLabel("📁")
-        self.icon_label.setFont(QFont("Arial", 24))
+        self.icon_label = QLabel()
+        self.icon_label.setPixmap(_emoji_pixmap("📁", 32))
         self.icon_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.icon_label.setStyleSheet("border: none; outline: none;")
         layout.addWidget(self.icon_label)
         
         self.text_label = QLabel("Drop video file here or click to browse")
-        self.text_label.setFont(QFont("Arial", 11))
+        self.text_label.setFont(_font("Arial", 11))
         self.text_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.text_label.setStyleSheet("color: #ccc; margin: 5px; border: none; outline: none;")
         layout.addWidget(self.text_label)
         
         self.setLayout(layout)
         
+    def set_state(self, state):
+        """Switch between the idle, hover and dropped looks without re-parsing QSS"""
+        self.setProperty("state", state)
+        repolish(self)
+    
     def dragEnterEvent(self, event: QDragEnterEvent):
         if event.mimeData().hasUrls():
             event.accept()
-            self.setStyleSheet("""
-                QFrame {
-                    border: 2px dashed #007acc;
-                    border-radius: 10px;
-                    background-color: #333;
-                    color: #007acc;
-                }
-            """)
+            self._state_before_drag = self.property("state")
+            self.set_state("hover")
         else:
             event.ignore()
     
     def dragLeaveEvent(self, event):
-        self.setStyleSheet("""
-            QFrame {
-                border: 2px dashed #555;
-                border-radius: 10px;
-                background-color: #2a2a2a;
-                color: #ccc;
-            }
-            QFrame:hover {
-                border-color: #007acc;
-                background-color: #333;
-            }
-        """)
+        self.set_state(self._state_before_drag)
     
     def dropEvent(self, event: QDropEvent):
         files = [u.toLocalFile() for u in event.mimeData().urls()]
+        self.set_state(self._state_before_drag)
+        event.acceptProposedAction()
         if files:
-            self.file_dropped.emit(files[0])
-        self.dragLeaveEvent(event)
+            # Handle the file after returning, so the drag source is released first
+            file_path = files[0]
+            QTimer.singleShot(0, lambda: self.file_dropped.emit(file_path))
     
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
-            file_path, _ = QFileDialog.getOpenFileName(
-                self, 
-                "Select Video File", 
-                "", 
-                "Video Files (*.mp4 *.avi *.mov *.mkv *.wmv *.flv *.webm)"
-            )
-            if file_path:
-                self.file_dropped.emit(file_path)
+            # Opened window-modal without blocking; the choice arrives via fileSelected
+            if self._file_dialog is None:
+                self._file_dialog = QFileDialog(self, "Select Video File", "", self.FILE_FILTER)
+                self._file_dialog.setFileMode(QFileDialog.FileMode.ExistingFile)
+                self._file_dialog.setOption(QFileDialog.Option.ReadOnly)
+                self._file_dialog.fileSelected.connect(self.file_dropped.emit)
+            self._file_dialog.open()
 
 
 class MainWindow(QMainWindow):
@@ -105,9 +264,6 @@ class MainWindow(QMainWindow):
         self.setGeometry(100, 100, 800, 520)
         self.current_video_path = None
         
-        # Apply dark theme
-        self._apply_dark_theme()
-        
         # Create central widget and main layout
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -117,9 +273,9 @@ class MainWindow(QMainWindow):
         
         # Title
         title = QLabel("YouTube Shorts Generator")
-        title.setFont(QFont("Segoe UI", 16, QFont.Weight.Bold))
+        title.setFont(_font("Segoe UI", 16, bold=True))
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title.setStyleSheet("color: #fff; margin-bottom: 5px;")
+        title.setObjectName("title")
         main_layout.addWidget(title)
         
         # Drop Zone
@@ -129,228 +285,87 @@ class MainWindow(QMainWindow):
         
         # Video info
         self.video_info_label = QLabel("")
-        self.video_info_label.setStyleSheet("color: #aaa; font-size: 12px; margin: 5px 0;")
+        self.video_info_label.setObjectName("caption")
         self.video_info_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         main_layout.addWidget(self.video_info_label)
         
-        # Create tabbed interface
-        self.tab_widget = self._create_tab_widget()
-        main_layout.addWidget(self.tab_widget)
+        # The settings tabs and clips list are built on the first file drop;
+        # empty placeholders hold their places in the layout until then
+        self._main_layout = main_layout
+        self._sections_built = False
+        self._tabs_placeholder = QWidget()
+        main_layout.addWidget(self._tabs_placeholder)
         
         # Generate button
-        self.generate_btn = QPushButton("✨ Generate Clips")
+        self.generate_btn = QPushButton("Generate Clips")
+        self.generate_btn.setIcon(_emoji_icon("✨"))
         self.generate_btn.setEnabled(False)
-        self.generate_btn.setStyleSheet(self._get_button_style("#6f42c1", large=True))
+        _style_button(self.generate_btn, "accent", large=True)
         main_layout.addWidget(self.generate_btn)
         
-        # Clips list
-        clips_frame = self._create_clips_frame()
-        main_layout.addWidget(clips_frame)
+        # Clips list placeholder
+        self._clips_placeholder = QWidget()
+        main_layout.addWidget(self._clips_placeholder)
         
         # Export button
-        self.export_btn = QPushButton("💾 Export All Clips")
+        self.export_btn = QPushButton("Export All Clips")
+        self.export_btn.setIcon(_emoji_icon("💾"))
         self.export_btn.setEnabled(False)
-        self.export_btn.setStyleSheet(self._get_button_style("#dc3545", large=True))
+        _style_button(self.export_btn, "danger", large=True)
         main_layout.addWidget(self.export_btn)
         
-        # Progress section
+        # Progress section, in its own box so showing or hiding the bar
+        # never reflows the rest of the window
+        progress_box = QWidget()
+        progress_layout = QVBoxLayout(progress_box)
+        progress_layout.setContentsMargins(0, 0, 0, 0)
+        
         self.progress_bar = QProgressBar()
+        # Keep the bar's space while hidden, so the box height never changes
+        size_policy = self.progress_bar.sizePolicy()
+        size_policy.setRetainSizeWhenHidden(True)
+        self.progress_bar.setSizePolicy(size_policy)
         self.progress_bar.setVisible(False)
-        self.progress_bar.setStyleSheet("""
-            QProgressBar {
-                border: 1px solid #555;
-                border-radius: 5px;
-                background-color: #2a2a2a;
-                text-align: center;
-                color: white;
-            }
-            QProgressBar::chunk {
-                background-color: #007acc;
-                border-radius: 4px;
-            }
-        """)
-        main_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.progress_bar)
         
         self.progress_label = QLabel("")
         self.progress_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.progress_label.setStyleSheet("color: #ccc; font-size: 12px;")
-        main_layout.addWidget(self.progress_label)
+        self.progress_label.setObjectName("status")
+        progress_layout.addWidget(self.progress_label)
+        main_layout.addWidget(progress_box)
+        
+        # Compatibility attributes for main.py: file loading is handled by the
+        # drop zone, and the removed inputs are fixed-value stand-ins
+        self.load_btn = self.drop_zone
+        self.base_name_input = _BASE_NAME_INPUT
+        self.end_spin = _END_SPIN
+        self.clip_name = _CLIP_NAME_INPUT
+        self.max_adjustment_spin = _MAX_ADJUSTMENT_SPIN
     
-    def _apply_dark_theme(self):
-        """Apply dark theme to the application"""
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #1e1e1e;
-                color: #ffffff;
-            }
-            QWidget {
-                background-color: #1e1e1e;
-                color: #ffffff;
-            }
-            QLabel {
-                color: #ffffff;
-            }
-            QSpinBox, QDoubleSpinBox, QLineEdit, QComboBox {
-                background-color: #2a2a2a;
-                border: 1px solid #555;
-                border-radius: 5px;
-                padding: 8px;
-                color: #fff;
-                font-size: 12px;
-                selection-background-color: #007acc;
-                selection-color: #fff;
-            }
-            QSpinBox:focus, QDoubleSpinBox:focus, QLineEdit:focus, QComboBox:focus {
-                border-color: #007acc;
-                outline: none;
-            }
-            QSpinBox QLineEdit, QDoubleSpinBox QLineEdit {
-                background-color: transparent;
-                border: none;
-                padding: 0px;
-                margin: 0px;
-                selection-background-color: #007acc;
-                selection-color: #fff;
-                color: #fff;
-            }
-            QSpinBox QLineEdit:focus, QDoubleSpinBox QLineEdit:focus {
-                background-color: transparent;
-                selection-background-color: #007acc;
-                selection-color: #fff;
-            }
-            QSpinBox::up-button, QDoubleSpinBox::up-button {
-                subcontrol-origin: border;
-                subcontrol-position: top right;
-                width: 20px;
-                border-left: 1px solid #555;
-                border-bottom: 1px solid #555;
-                border-top-right-radius: 5px;
-                background-color: #3a3a3a;
-            }
-            QSpinBox::up-button:hover, QDoubleSpinBox::up-button:hover {
-                background-color: #007acc;
-            }
-            QSpinBox::up-button:pressed, QDoubleSpinBox::up-button:pressed {
-                background-color: #005a9e;
-            }
-            QSpinBox::up-arrow, QDoubleSpinBox::up-arrow {
-                image: none;
-                border-left: 4px solid transparent;
-                border-right: 4px solid transparent;
-                border-bottom: 6px solid #ccc;
-                width: 0px;
-                height: 0px;
-            }
-            QSpinBox::up-arrow:hover, QDoubleSpinBox::up-arrow:hover {
-                border-bottom-color: #fff;
-            }
-            QSpinBox::down-button, QDoubleSpinBox::down-button {
-                subcontrol-origin: border;
-                subcontrol-position: bottom right;
-                width: 20px;
-                border-left: 1px solid #555;
-                border-top: 1px solid #555;
-                border-bottom-right-radius: 5px;
-                background-color: #3a3a3a;
-            }
-            QSpinBox::down-button:hover, QDoubleSpinBox::down-button:hover {
-                background-color: #007acc;
-            }
-            QSpinBox::down-button:pressed, QDoubleSpinBox::down-button:pressed {
-                background-color: #005a9e;
-            }
-            QSpinBox::down-arrow, QDoubleSpinBox::down-arrow {
-                image: none;
-                border-left: 4px solid transparent;
-                border-right: 4px solid transparent;
-                border-top: 6px solid #ccc;
-                width: 0px;
-                height: 0px;
-            }
-            QSpinBox::down-arrow:hover, QDoubleSpinBox::down-arrow:hover {
-                border-top-color: #fff;
-            }
-            QListWidget {
-                background-color: #2a2a2a;
-                border: 1px solid #555;
-                border-radius: 5px;
-                color: #fff;
-                selection-background-color: #007acc;
-            }
-            QCheckBox {
-                color: #fff;
-                spacing: 8px;
-            }
-            QCheckBox::indicator {
-                width: 16px;
-                height: 16px;
-                border: 1px solid #555;
-                border-radius: 3px;
-                background-color: #2a2a2a;
-            }
-            QCheckBox::indicator:checked {
-                background-color: #007acc;
-                border-color: #007acc;
-            }
-            QTabWidget::pane {
-                border: 1px solid #555;
-                border-radius: 5px;
-                background-color: #2a2a2a;
-                top: -1px;
-            }
-            QTabBar::tab {
-                background-color: #3a3a3a;
-                color: #ccc;
-                padding: 8px 16px;
-                margin-right: 2px;
-                border-top-left-radius: 5px;
-                border-top-right-radius: 5px;
-                border: 1px solid #555;
-                border-bottom: none;
-            }
-            QTabBar::tab:selected {
-                background-color: #2a2a2a;
-                color: #fff;
-                border-color: #007acc;
-                border-bottom: 1px solid #2a2a2a;
-            }
-            QTabBar::tab:hover:!selected {
-                background-color: #4a4a4a;
-                color: #fff;
-            }
-        """)
+    def _build_sections(self):
+        """Build the settings tabs and clips list in place of their placeholders"""
+        if self._sections_built:
+            return
+        self._sections_built = True
+        
+        self.tab_widget = self._create_tab_widget()
+        self._replace_placeholder(self._tabs_placeholder, self.tab_widget)
+        self._replace_placeholder(self._clips_placeholder, self._create_clips_frame())
+        
+        # Compatibility attributes for main.py that point into the new sections
+        self.add_clip_btn = self.add_manual_clip_btn
+        self.remove_btn = self.clear_btn  # Individual clip removal handled by clear button
+        self.start_spin = _TimeInputWrapper(self.manual_start_input)
+        self._on_sections_built()
     
-    def _get_button_style(self, color, large=False):
-        """Get button style with specified color"""
-        size = "padding: 10px 25px; font-size: 13px;" if large else "padding: 6px 15px; font-size: 11px;"
-        return f"""
-            QPushButton {{
-                {size}
-                background-color: {color};
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: {self._darken_color(color)};
-            }}
-            QPushButton:disabled {{
-                background-color: #555;
-                color: #999;
-            }}
-        """
+    def _replace_placeholder(self, placeholder, widget):
+        """Swap a placeholder in the main layout for the real widget"""
+        self._main_layout.replaceWidget(placeholder, widget)
+        placeholder.deleteLater()
     
-    def _darken_color(self, color):
-        """Darken a hex color for hover effect"""
-        color_map = {
-            "#28a745": "#218838",
-            "#6f42c1": "#5a32a3", 
-            "#dc3545": "#c82333",
-            "#007bff": "#0056b3",
-            "#17a2b8": "#138496"
-        }
-        return color_map.get(color, color)
+    def _on_sections_built(self):
+        """Called once the lazily built sections exist, to connect their signals"""
+        pass
     
     def _create_tab_widget(self):
         """Create tabbed interface for settings and analysis"""
@@ -358,11 +373,11 @@ class MainWindow(QMainWindow):
         
         # Create settings tab (default)
         settings_frame = self._create_settings_frame()
-        tab_widget.addTab(settings_frame, "⚙️ Clip Settings")
+        tab_widget.addTab(settings_frame, _emoji_icon("⚙️"), "Clip Settings")
         
         # Create analysis tab
         analysis_frame = self._create_analysis_frame()
-        tab_widget.addTab(analysis_frame, "🔍 Video Analysis")
+        tab_widget.addTab(analysis_frame, _emoji_icon("🔍"), "Video Analysis")
         
         # Set clips settings as default tab
         tab_widget.setCurrentIndex(0)
@@ -371,8 +386,11 @@ class MainWindow(QMainWindow):
     
     def handle_file_drop(self, file_path):
         """Handle file drop/selection"""
+        # Hold repaints so the burst of changes below lands in one paint
+        self.setUpdatesEnabled(False)
+        self._build_sections()
         self.current_video_path = file_path
-        filename = file_path.split('/')[-1] if '/' in file_path else file_path.split('\\')[-1]
+        filename = os.path.basename(file_path)
         self.video_info_label.setText(f"📹 {filename}")
         self.analyze_btn.setEnabled(True)
         self.generate_btn.setEnabled(True)
@@ -383,14 +401,8 @@ class MainWindow(QMainWindow):
         
         # Update drop zone appearance
         self.drop_zone.text_label.setText(f"✅ {filename}")
-        self.drop_zone.setStyleSheet("""
-            QFrame {
-                border: 2px solid #28a745;
-                border-radius: 10px;
-                background-color: #2a2a2a;
-                color: #28a745;
-            }
-        """)
+        self.drop_zone.set_state("dropped")
+        self.setUpdatesEnabled(True)
     
     def _create_analysis_frame(self):
         """Create analysis options frame"""
@@ -402,29 +414,23 @@ class MainWindow(QMainWindow):
         
         # Analyze button at top
         button_layout = QHBoxLayout()
-        self.analyze_btn = QPushButton("🔍 Analyze Video")
+        self.analyze_btn = QPushButton("Analyze Video")
+        self.analyze_btn.setIcon(_emoji_icon("🔍"))
         self.analyze_btn.setEnabled(False)
-        self.analyze_btn.setStyleSheet(self._get_button_style("#28a745"))
+        _style_button(self.analyze_btn, "success")
         self.analyze_btn.setMaximumWidth(150)
         button_layout.addWidget(self.analyze_btn)
         button_layout.addStretch()
         layout.addLayout(button_layout)
         
         # Checkboxes for analysis options
-        options_layout = QHBoxLayout()
-        
         self.scene_detection_checkbox = QCheckBox("Scene Detection")
         self.scene_detection_checkbox.setChecked(True)
-        options_layout.addWidget(self.scene_detection_checkbox)
-        
-        options_layout.addSpacing(20)
         
         self.audio_detection_checkbox = QCheckBox("Audio Detection")
         self.audio_detection_checkbox.setChecked(False)
-        options_layout.addWidget(self.audio_detection_checkbox)
         
-        options_layout.addStretch()
-        layout.addLayout(options_layout)
+        layout.addLayout(_row_grid([self.scene_detection_checkbox, self.audio_detection_checkbox]))
         
         # Add stretch to push content to top
         layout.addStretch()
@@ -439,77 +445,66 @@ class MainWindow(QMainWindow):
         layout.setSpacing(10)
         layout.setContentsMargins(10, 10, 10, 10)
         
-        # First row
-        row1 = QHBoxLayout()
-        row1.addWidget(QLabel("Clips:"))
+        # Label/field pairs
+        form = QFormLayout()
+        form.setLabelAlignment(Qt.AlignmentFlag.AlignLeft)
         self.num_clips_spin = QSpinBox()
         self.num_clips_spin.setRange(1, 20)
         self.num_clips_spin.setValue(5)
         self.num_clips_spin.setMaximumWidth(60)
-        # Configure for proper manual editing
-        self.num_clips_spin.setKeyboardTracking(True)
+        # Commit typed values once editing finishes, not on every keystroke
+        self.num_clips_spin.setKeyboardTracking(False)
         self.num_clips_spin.setButtonSymbols(QAbstractSpinBox.ButtonSymbols.UpDownArrows)
-        self.num_clips_spin.setFocusPolicy(Qt.FocusPolicy.WheelFocus)
-        # Ensure the line edit is editable
-        line_edit = self.num_clips_spin.lineEdit()
-        if line_edit:
-            line_edit.setReadOnly(False)
-            line_edit.selectAll()  # This helps with initial selection
-        row1.addWidget(self.num_clips_spin)
-        
-        row1.addSpacing(20)
-        row1.addWidget(QLabel("Duration:"))
+        self.num_clips_spin.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+        form.addRow("Clips:", self.num_clips_spin)
+        
         self.clip_duration_spin = QDoubleSpinBox()
         self.clip_duration_spin.setRange(1.0, 180.0)
         self.clip_duration_spin.setValue(30.0)
         self.clip_duration_spin.setMaximumWidth(80)
         self.clip_duration_spin.setDecimals(1)
         self.clip_duration_spin.setSingleStep(0.5)
-        # Configure for proper manual editing
-        self.clip_duration_spin.setKeyboardTracking(True)
+        # Commit typed values once editing finishes, not on every keystroke
+        self.clip_duration_spin.setKeyboardTracking(False)
         self.clip_duration_spin.setButtonSymbols(QAbstractSpinBox.ButtonSymbols.UpDownArrows)
-        self.clip_duration_spin.setFocusPolicy(Qt.FocusPolicy.WheelFocus)
-        # Ensure the line edit is editable
-        line_edit = self.clip_duration_spin.lineEdit()
-        if line_edit:
-            line_edit.setReadOnly(False)
-            line_edit.selectAll()  # This helps with initial selection
-        row1.addWidget(self.clip_duration_spin)
-        row1.addWidget(QLabel("sec"))
-        
-        row1.addStretch()
-        layout.addLayout(row1)
-        
-        # Second row
-        row2 = QHBoxLayout()
-        row2.addWidget(QLabel("Method:"))
+        self.clip_duration_spin.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+        form.addRow("Duration (sec):", self.clip_duration_spin)
+        
         self.generation_method = QComboBox()
-        self.generation_method.addItems([
-            "Random",
-            "Smart Detection"
-        ])
-        self.generation_method.setCurrentText("Smart Detection")
+        # Items follow GenMethod order, so the current index is the method
+        self.generation_method.addItems(list(GEN_METHOD_LABELS.values()))
+        self.generation_method.setCurrentIndex(GenMethod.SMART)
         self.generation_method.setMinimumWidth(200)
         self.generation_method.setMaximumWidth(250)
-        row2.addWidget(self.generation_method)
+        form.addRow("Method:", self.generation_method)
+        layout.addLayout(form)
         
-        row2.addSpacing(20)
+        # Option checkboxes
         self.allow_overlap_checkbox = QCheckBox("Allow Overlapping")
         self.allow_overlap_checkbox.setChecked(True)
-        row2.addWidget(self.allow_overlap_checkbox)
         
-        row2.addStretch()
-        layout.addLayout(row2)
+        self.frame_accurate_checkbox = QCheckBox("Frame-Accurate Cuts")
+        self.frame_accurate_checkbox.setToolTip("Re-encode clips instead of copying streams (slower)")
+        self.frame_accurate_checkbox.setChecked(False)
+        
+        self.hw_encoder_checkbox = QCheckBox("Use Hardware Encoder")
+        self.hw_encoder_checkbox.setToolTip("Re-encode with NVENC/QSV/VideoToolbox/AMF when available; "
+                                            "uncheck to always use libx264")
+        self.hw_encoder_checkbox.setChecked(True)
+        # Only matters when clips are re-encoded
+        self.hw_encoder_checkbox.setEnabled(False)
+        self.frame_accurate_checkbox.toggled.connect(self.hw_encoder_checkbox.setEnabled)
+        
+        layout.addLayout(_row_grid([self.allow_overlap_checkbox, self.frame_accurate_checkbox,
+                                    self.hw_encoder_checkbox]))
         
         # Manual clip title
         manual_clip_title = QLabel("Manual Clip")
-        manual_clip_title.setFont(QFont("Segoe UI", 11, QFont.Weight.Bold))
-        manual_clip_title.setStyleSheet("color: #fff; margin-top: 5px; margin-bottom: 2px;")
+        manual_clip_title.setFont(_font("Segoe UI", 11, bold=True))
+        manual_clip_title.setObjectName("sectionTitle")
         layout.addWidget(manual_clip_title)
         
         # Third row - Manual clip
-        row3 = QHBoxLayout()
-        row3.addWidget(QLabel("Clip Start:"))
         self.manual_start_input = QLineEdit()
         self.manual_start_input.setText("00:00")
         self.manual_start_input.setMaximumWidth(80)
@@ -519,46 +514,46 @@ class MainWindow(QMainWindow):
         time_regex = QRegularExpression(r"^([0-9]{1,2}):([0-5][0-9])$")
         time_validator = QRegularExpressionValidator(time_regex)
         self.manual_start_input.setValidator(time_validator)
-        row3.addWidget(self.manual_start_input)
         
-        self.add_manual_clip_btn = QPushButton("➕ Add")
-        self.add_manual_clip_btn.setStyleSheet(self._get_button_style("#17a2b8"))
+        self.add_manual_clip_btn = QPushButton("Add")
+        self.add_manual_clip_btn.setIcon(_emoji_icon("➕"))
+        _style_button(self.add_manual_clip_btn, "info")
         self.add_manual_clip_btn.setMaximumWidth(80)
         self.add_manual_clip_btn.setEnabled(False)  # Disabled initially
-        row3.addWidget(self.add_manual_clip_btn)
         
-        row3.addStretch()
-        layout.addLayout(row3)
+        layout.addLayout(_row_grid([QLabel("Clip Start:"), self.manual_start_input,
+                                    self.add_manual_clip_btn], spacing=8))
         
         return frame
     
+    def _make_card(self):
+        """Create a frame styled by the shared #card rule"""
+        frame = QFrame()
+        frame.setObjectName("card")
+        frame.setAttribute(Qt.WidgetAttribute.WA_StyledBackground, True)
+        return frame
+    
     def _create_clips_frame(self):
         """Create clips list frame"""
-        frame = QFrame()
-        frame.setStyleSheet("""
-            QFrame {
-                background-color: #2a2a2a;
-                border-radius: 10px;
-                padding: 10px;
-            }
-        """)
+        frame = self._make_card()
         
         layout = QVBoxLayout(frame)
         
         # Header
         header = QHBoxLayout()
         clips_label = QLabel("Generated Clips")
-        clips_label.setFont(QFont("Segoe UI", 12, QFont.Weight.Bold))
+        clips_label.setFont(_font("Segoe UI", 12, bold=True))
         header.addWidget(clips_label)
         
         self.clips_count_label = QLabel("(0 clips)")
-        self.clips_count_label.setStyleSheet("color: #aaa; font-size: 11px;")
+        self.clips_count_label.setObjectName("count")
         header.addWidget(self.clips_count_label)
         header.addStretch()
         
         # Clear button
-        self.clear_btn = QPushButton("🗑️ Clear All")
-        self.clear_btn.setStyleSheet(self._get_button_style("#6c757d"))
+        self.clear_btn = QPushButton("Clear All")
+        self.clear_btn.setIcon(_emoji_icon("🗑️"))
+        _style_button(self.clear_btn, "secondary")
         self.clear_btn.setMinimumWidth(120)
         self.clear_btn.setMaximumWidth(150)
         header.addWidget(self.clear_btn)
@@ -566,82 +561,14 @@ class MainWindow(QMainWindow):
         layout.addLayout(header)
         
         # Clips list
-        self.clips_list = QListWidget()
+        self.clips_model = ClipListModel()
+        self.clips_list = QListView()
+        self.clips_list.setModel(self.clips_model)
         self.clips_list.setMaximumHeight(90)
+        # Every row is one line of text, so skip measuring each item
+        self.clips_list.setUniformItemSizes(True)
         layout.addWidget(self.clips_list)
         
         return frame
     
-    # Add compatibility properties for main.py
-    @property
-    def load_btn(self):
-        """Compatibility property - file loading is handled by drop zone"""
-        return self.drop_zone
-    
-    @property 
-    def add_clip_btn(self):
-        """Compatibility property - returns the manual add clip button"""
-        return self.add_manual_clip_btn
-    
-    @property
-    def remove_btn(self):
-        """Compatibility property - individual clip removal handled by clear button"""
-        return self.clear_btn
-    
-    @property
-    def base_name_input(self):
-        """Compatibility property - base name is fixed in minimal UI"""
-        class DummyInput:
-            def text(self): return "short"
-        return DummyInput()
-    
-    @property
-    def start_spin(self):
-        """Compatibility property - returns a wrapper for the manual time input"""
-        class TimeInputWrapper:
-            def __init__(self, time_input):
-                self.time_input = time_input
-            
-            def setMaximum(self, val):
-                pass  # Not needed for time input
-            
-            def value(self):
-                """Convert MM:SS format to seconds"""
-                time_text = self.time_input.text()
-                try:
-                    if ":" in time_text:
-                        minutes, seconds = time_text.split(":")
-                        return int(minutes) * 60 + int(seconds)
-                    else:
-                        return 0
-                except (ValueError, IndexError):
-                    return 0
-        
-        return TimeInputWrapper(self.manual_start_input)
-    
-    @property
-    def end_spin(self):
-        """Compatibility property - manual clip adding removed"""
-        class DummySpin:
-            def setMaximum(self, val): pass
-            def setValue(self, val): pass
-            def value(self): return 60
-        return DummySpin()
-    
-    @property
-    def clip_name(self):
-        """Compatibility property - manual clip adding removed"""
-        class DummyInput:
-            def text(self): return ""
-            def setText(self, text): pass
-        return DummyInput()
-    
-    @property
-    def max_adjustment_spin(self):
-        """Compatibility property - max adjustment removed for minimal UI"""
-        class DummySpin:
-            def value(self): return 2.0
-            def setEnabled(self, enabled): pass
-        return DummySpin()
-    
     # Real properties for the new checkboxes are created in _create_analysis_frame
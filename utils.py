@@ -1,34 +1,165 @@
 """
 Utility functions for the video clip extractor
 """
+import os
+import re
+import json
+import subprocess
+from functools import lru_cache
+
+import numpy as np
+
+
+# Clip list label: name (MM:SS - MM:SS, duration)
+_format_clip_label = "{0} ({1:02d}:{2:02d} - {3:02d}:{4:02d}, {5:.1f}s)".format
+
+# HH:MM:SS, MM:SS (seconds may be fractional) or bare seconds
+_TIME_RE = re.compile(r'^(?:(?:(\d+):)?(\d+):(\d+(?:\.\d+)?)|(\d+(?:\.\d+)?))$')
 
 
 def format_time(seconds):
     """Format seconds into MM:SS format"""
-    minutes = int(seconds // 60)
-    seconds = int(seconds % 60)
+    return _format_whole_seconds(int(seconds))
+
+
+@lru_cache(maxsize=8192)  # Every second of a ~2h video
+def _format_whole_seconds(seconds):
+    """Format whole seconds into MM:SS (cached, the domain is small)"""
+    minutes, seconds = divmod(seconds, 60)
     return f"{minutes:02d}:{seconds:02d}"
 
 
+def format_clip_labels(names, starts, ends):
+    """Build clip list labels, splitting all times into MM:SS in one vectorized pass"""
+    starts = np.asarray(starts, dtype=np.float64)
+    ends = np.asarray(ends, dtype=np.float64)
+    start_min, start_sec = np.divmod(starts.astype(np.int64), 60)
+    end_min, end_sec = np.divmod(ends.astype(np.int64), 60)
+    durations = ends - starts
+    
+    return list(map(_format_clip_label, names, start_min.tolist(), start_sec.tolist(),
+                    end_min.tolist(), end_sec.tolist(), durations.tolist()))
+
+
+def parse_time(text):
+    """Parse HH:MM:SS, MM:SS or plain seconds into seconds"""
+    match = _TIME_RE.match(text.strip())
+    if not match:
+        raise ValueError(f"Invalid time format: {text}")
+    
+    hours, minutes, seconds, bare_seconds = match.groups()
+    if bare_seconds is not None:
+        return float(bare_seconds)
+    return int(hours or 0) * 3600 + int(minutes) * 60 + float(seconds)
+
+
 def is_valid_video_file(file_path):
     """Check if the file is a valid video file"""
     valid_extensions = ('.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv', '.webm')
     return file_path.lower().endswith(valid_extensions)
 
 
-def get_video_info(file_path):
-    """Get basic video information"""
-    from moviepy.video.io.VideoFileClip import VideoFileClip
+def get_video_metadata(file_path):
+    """Read duration and frame size with a single ffprobe call"""
+    command = [
+        'ffprobe', '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'format=duration:stream=width,height',
+        '-of', 'json',
+        file_path
+    ]
     
     try:
-        video = VideoFileClip(file_path)
-        duration = int(video.duration)
-        video.close()
-        return duration
+        result = subprocess.run(command, capture_output=True, text=True, check=True)
+        info = json.loads(result.stdout)
+        stream = (info.get('streams') or [{}])[0]
+        return {
+            'duration': float(info['format']['duration']),
+            'width': int(stream.get('width', 0)),
+            'height': int(stream.get('height', 0)),
+        }
+    except subprocess.CalledProcessError as e:
+        raise Exception(f"Failed to load video: {e.stderr.strip()}")
     except Exception as e:
         raise Exception(f"Failed to load video: {str(e)}")
 
 
+def get_video_info(file_path):
+    """Get basic video information"""
+    return int(get_video_metadata(file_path)['duration'])
+
+
+def get_keyframe_times(file_path):
+    """List the keyframe timestamps of the first video stream, sorted
+    
+    Reads packet flags from the demuxer, so nothing is decoded.
+    """
+    command = [
+        'ffprobe', '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'packet=pts_time,flags',
+        '-of', 'csv=p=0',
+        file_path
+    ]
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    times = []
+    for line in result.stdout.split():
+        pts_time, _, flags = line.partition(',')
+        if 'K' in flags and pts_time != 'N/A':
+            times.append(float(pts_time))
+    return np.sort(np.asarray(times, dtype=np.float64))
+
+
+# Hardware H.264 encoders in order of preference, with their rate-control arguments
+HARDWARE_ENCODERS = {
+    'h264_nvenc': ['-preset', 'p4', '-b:v', '6M'],
+    'h264_qsv': ['-preset', 'medium', '-b:v', '6M'],
+    'h264_videotoolbox': ['-b:v', '6M'],
+    'h264_amf': ['-quality', 'balanced', '-b:v', '6M'],
+}
+
+
+@lru_cache(maxsize=1)
+def detect_hardware_encoder():
+    """Return the first hardware H.264 encoder this FFmpeg build offers, or None"""
+    try:
+        result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'],
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    
+    available = {line.split()[1] for line in result.stdout.splitlines() if len(line.split()) > 1}
+    return next((name for name in HARDWARE_ENCODERS if name in available), None)
+
+
+def video_cache_key(file_path):
+    """Identify a video file by path, modification time and size"""
+    st = os.stat(file_path)
+    return os.path.abspath(file_path), st.st_mtime_ns, st.st_size
+
+
+@lru_cache(maxsize=64)
+def _probe_cached(path, mtime_ns, size):
+    """Probe a video once per (path, mtime, size) key"""
+    return get_video_metadata(path)
+
+
+@lru_cache(maxsize=16)
+def _keyframes_cached(path, mtime_ns, size):
+    """List keyframes once per (path, mtime, size) key"""
+    return get_keyframe_times(path)
+
+
+def get_video_metadata_cached(file_path):
+    """Get video metadata, reusing earlier probes of an unchanged file"""
+    return dict(_probe_cached(*video_cache_key(file_path)))
+
+
+def get_keyframe_times_cached(file_path):
+    """Get keyframe timestamps, reusing earlier scans of an unchanged file"""
+    return _keyframes_cached(*video_cache_key(file_path))
+
+
 def validate_clip_parameters(start, end, video_duration):
     """Validate clip parameters"""
     if start >= end:
@@ -3,7 +3,7 @@ Video analysis functionality for scene detection and speech boundary detection
 """
 import os
 import numpy as np
-from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
 from moviepy.video.io.VideoFileClip import VideoFileClip
 from scenedetect import open_video, SceneManager
 from scenedetect.detectors import ContentDetector
@@ -11,40 +11,52 @@ import librosa
 from scipy import signal
 
 
-class AnalysisThread(QThread):
-    """Thread for analyzing video scenes and speech"""
+class AnalysisSignals(QObject):
+    """Signals emitted by AnalysisRunnable"""
     progress = pyqtSignal(str)
-    finished = pyqtSignal(dict)
+    finished = pyqtSignal(object)  # dict of float64 arrays and the analysed path
+
+
+class AnalysisRunnable(QRunnable):
+    """Thread pool task for analyzing video scenes and speech"""
     
-    def __init__(self, video_path, analyze_scenes=True, analyze_audio=True):
+    def __init__(self, video_path, analyze_scenes=True, analyze_audio=True, analyze_fps=None):
         super().__init__()
+        self.signals = AnalysisSignals()
         self.video_path = video_path
         self.analyze_scenes = analyze_scenes
         self.analyze_audio = analyze_audio
+        # Frames per second actually decoded for scene detection (None = every frame)
+        self.analyze_fps = analyze_fps
         
     def run(self):
         try:
-            result = {
-                'scenes': [],
-                'speech_boundaries': [],
-                'error': None
-            }
+            scenes = []
+            speech_boundaries = []
             
             # Detect scenes if enabled
             if self.analyze_scenes:
-                self.progress.emit("Detecting scene changes...")
-                result['scenes'] = self.detect_scenes()
+                self.signals.progress.emit("Detecting scene changes...")
+                scenes = self.detect_scenes()
             
             # Detect speech boundaries if enabled
             if self.analyze_audio:
-                self.progress.emit("Analyzing speech patterns...")
-                result['speech_boundaries'] = self.detect_speech_boundaries()
+                self.signals.progress.emit("Analyzing speech patterns...")
+                speech_boundaries = self.detect_speech_boundaries()
             
-            self.finished.emit(result)
+            self.signals.finished.emit(self._make_result(scenes, speech_boundaries))
             
         except Exception as e:
-            result = {'scenes': [], 'speech_boundaries': [], 'error': str(e)}
-            self.finished.emit(result)
+            self.signals.finished.emit(self._make_result(error=str(e)))
+    
+    def _make_result(self, scenes=(), speech_boundaries=(), error=None):
+        """Build a result dict with scenes as an (N, 2) array and boundaries as a 1-D array"""
+        return {
+            'video_path': self.video_path,
+            'scenes': np.asarray(scenes, dtype=np.float64).reshape(-1, 2),
+            'speech_boundaries': np.asarray(speech_boundaries, dtype=np.float64),
+            'error': error
+        }
     
     def detect_scenes(self):
         """Detect scene changes using PySceneDetect"""
@@ -53,7 +65,12 @@ class AnalysisThread(QThread):
             scene_manager = SceneManager()
             scene_manager.add_detector(ContentDetector(threshold=27.0))
             
-            scene_manager.detect_scenes(video)
+            # Skipped frames are only grabbed, not decoded
+            frame_skip = 0
+            if self.analyze_fps and video.frame_rate > self.analyze_fps:
+                frame_skip = int(round(video.frame_rate / self.analyze_fps)) - 1
+            
+            scene_manager.detect_scenes(video, frame_skip=frame_skip)
             scene_list = scene_manager.get_scene_list()
             
             # Convert to timestamps in seconds
@@ -84,7 +101,7 @@ class AnalysisThread(QThread):
                                        codec='pcm_s16le', logger=None)
             video.close()
             
-            self.progress.emit("Analyzing audio energy patterns...")
+            self.signals.progress.emit("Analyzing audio energy patterns...")
             
             # Load audio with librosa
             y, sr = librosa.load(temp_audio, sr=22050, mono=True)
@@ -120,38 +137,12 @@ class AnalysisThread(QThread):
             is_speech = combined_energy > threshold
             
             # Find boundaries where speech ends (silence begins)
-            speech_boundaries = []
-            in_speech = False
-            silence_frames = 0
-            min_silence_frames = int(0.3 * sr / hop_length)  # 300ms of silence
+            min_silence_frames = max(1, int(0.3 * sr / hop_length))  # 300ms of silence
             min_speech_frames = int(0.25 * sr / hop_length)  # 250ms minimum speech
-            speech_start_frame = 0
-            
-            for i, speech_frame in enumerate(is_speech):
-                time = librosa.frames_to_time(i, sr=sr, hop_length=hop_length)
-                
-                if speech_frame:
-                    if not in_speech:
-                        # Speech started
-                        speech_start_frame = i
-                        in_speech = True
-                    silence_frames = 0
-                else:
-                    # Silence detected
-                    if in_speech:
-                        silence_frames += 1
-                        
-                        # If silence long enough and speech was long enough
-                        if silence_frames >= min_silence_frames:
-                            speech_duration = i - speech_start_frame
-                            if speech_duration >= min_speech_frames:
-                                # Mark this as a speech boundary
-                                boundary_time = librosa.frames_to_time(
-                                    i - silence_frames // 2, sr=sr, hop_length=hop_length)
-                                speech_boundaries.append(boundary_time)
-                            
-                            in_speech = False
-                            silence_frames = 0
+            boundary_frames = self._find_speech_end_frames(
+                is_speech, min_silence_frames, min_speech_frames)
+            speech_boundaries = librosa.frames_to_time(
+                boundary_frames, sr=sr, hop_length=hop_length).tolist()
             
             # Clean up temporary file
             if os.path.exists(temp_audio):
@@ -172,11 +163,47 @@ class AnalysisThread(QThread):
             import traceback
             traceback.print_exc()
             return []
+    
+    @staticmethod
+    def _find_speech_end_frames(is_speech, min_silence_frames, min_speech_frames):
+        """Find frames in the middle of the pauses that end speech segments
+        
+        A speech segment ends at the first silence run of at least
+        min_silence_frames, and only counts if it lasted min_speech_frames.
+        Works on whole runs with NumPy so the per-frame loop stays in C.
+        """
+        is_speech = np.asarray(is_speech, dtype=bool)
+        if not is_speech.any():
+            return np.zeros(0, dtype=np.int64)
+        
+        # Silence runs as [start, end) pairs, padding both sides with speech
+        edges = np.diff(np.concatenate(([1], is_speech.astype(np.int8), [1])))
+        silence_starts = np.flatnonzero(edges == -1)
+        silence_ends = np.flatnonzero(edges == 1)
+        
+        # Long pauses close a segment; leading silence has no speech to close
+        long_pause = ((silence_ends - silence_starts) >= min_silence_frames) & (silence_starts > 0)
+        pause_starts = silence_starts[long_pause]
+        pause_ends = silence_ends[long_pause]
+        
+        # Each segment starts at the first speech frame after the previous long pause
+        segment_starts = np.concatenate(([np.argmax(is_speech)], pause_ends[:-1]))
+        
+        # The segment is closed on the last frame needed to reach the pause length
+        close_frames = pause_starts + min_silence_frames - 1
+        long_enough = (close_frames - segment_starts) >= min_speech_frames
+        return close_frames[long_enough] - min_silence_frames // 2
 
 
 class SmartBoundaryFinder:
     """Helper class for finding smart boundaries for cuts"""
     
+    # Short priority names used by the main window
+    PRIORITY_ALIASES = {
+        "Scenes": "Scene Changes First",
+        "Speech": "Speech Boundaries First",
+    }
+    
     @staticmethod
     def find_smart_boundary(time_point, scenes, speech_boundaries, 
                           enable_smart_cuts, priority, max_adjustment, boundary_type='start'):
@@ -184,7 +211,9 @@ class SmartBoundaryFinder:
         if not enable_smart_cuts:
             return time_point
         
-        if not scenes and not speech_boundaries:
+        priority = SmartBoundaryFinder.PRIORITY_ALIASES.get(priority, priority)
+        
+        if len(scenes) == 0 and len(speech_boundaries) == 0:
             return time_point
         
         # Get candidate boundaries within range
@@ -231,4 +260,61 @@ class SmartBoundaryFinder:
                 if all_boundaries:
                     return min(all_boundaries, key=lambda x: abs(x - time_point))
         
-        return time_point
\ No newline at end of file
+        return time_point
+    
+    @staticmethod
+    def snap_to_nearest(points, boundaries, max_adjustment):
+        """Snap each point to its nearest boundary within max_adjustment
+        
+        `boundaries` must be a sorted float64 array. Returns the snapped points
+        and a boolean mask of the points that found a boundary.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        if boundaries.size == 0:
+            return points.copy(), np.zeros(points.shape, dtype=bool)
+        
+        idx = np.searchsorted(boundaries, points)
+        left = boundaries[np.clip(idx - 1, 0, boundaries.size - 1)]
+        right = boundaries[np.clip(idx, 0, boundaries.size - 1)]
+        
+        # Ties go to the earlier boundary, like min() over a sorted list
+        nearest = np.where(points - left <= right - points, left, right)
+        
+        found = np.abs(nearest - points) <= max_adjustment
+        return np.where(found, nearest, points), found
+    
+    @staticmethod
+    def find_smart_boundary_batch(points, scene_boundaries, speech_boundaries,
+                                  priority, max_adjustment, boundary_type='start'):
+        """Vectorized find_smart_boundary for an array of cut points
+        
+        `scene_boundaries` and `speech_boundaries` are sorted float64 arrays of
+        candidate boundaries (scene starts or ends, matching `boundary_type`).
+        Each priority tries the same candidates, in the same order, as the
+        scalar version.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        priority = SmartBoundaryFinder.PRIORITY_ALIASES.get(priority, priority)
+        either = np.union1d(scene_boundaries, speech_boundaries)
+        
+        if priority == "Scene Changes First":
+            candidates = (scene_boundaries, speech_boundaries)
+        elif priority == "Speech Boundaries First":
+            candidates = (speech_boundaries, scene_boundaries)
+        elif priority == "Nearest Boundary (either)":
+            candidates = (either,)
+        elif priority == "Scene Start + Speech End":
+            preferred = scene_boundaries if boundary_type == 'start' else speech_boundaries
+            candidates = (preferred, either)
+        else:
+            return points.copy()
+        
+        result = points.copy()
+        pending = np.ones(points.shape, dtype=bool)
+        for boundaries in candidates:
+            snapped, found = SmartBoundaryFinder.snap_to_nearest(points, boundaries, max_adjustment)
+            take = pending & found
+            result[take] = snapped[take]
+            pending &= ~found
+        
+        return result
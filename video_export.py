@@ -2,87 +2,317 @@
 Video export functionality for creating clips using direct FFmpeg (faster than MoviePy)
 """
 import os
+import bisect
 import subprocess
-import cv2
-from PyQt6.QtCore import QThread, pyqtSignal
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
 
+from utils import HARDWARE_ENCODERS, detect_hardware_encoder, get_keyframe_times_cached
 
-class ExportThread(QThread):
-    """Thread for exporting video clips"""
+
+class ExportError(Exception):
+    """Raised inside ExportRunnable with a message ready to show the user"""
+
+
+class ExportSignals(QObject):
+    """Signals emitted by ExportRunnable"""
     progress = pyqtSignal(int, str)
     finished = pyqtSignal(bool, str)
+
+
+class ExportRunnable(QRunnable):
+    """Thread pool task for exporting video clips"""
+    
+    # x264 stops scaling around here; parallel clips use the remaining cores
+    ENCODE_THREADS = 4
+    
+    # Minimum seconds between progress signals (the last clip is always reported)
+    PROGRESS_INTERVAL = 0.25
+    
+    # An output larger than this has received packets, not just its container header
+    OUTPUT_HEADER_BYTES = 4096
+    
+    # Seconds of slack around a snapped start, covering the 6-decimal rounding
+    # of ffprobe timestamps (well under one frame)
+    KEYFRAME_TOLERANCE = 0.001
     
-    def __init__(self, video_path, clips, output_folder):
+    def __init__(self, video_path, clips, output_folder, stream_copy=False, max_workers=None,
+                 single_pass=False, video_meta=None, use_hw_encoder=False):
         super().__init__()
+        self.signals = ExportSignals()
         self.video_path = video_path
         self.clips = clips
         self.output_folder = output_folder
+        # Output files, built once and indexed like self.clips
+        self.output_paths = [os.path.join(output_folder, f"{name}.mp4") for _, _, name in clips]
+        # Metadata from the load-time probe, so the file is not reopened here
+        self.video_meta = video_meta or {}
+        # Export every clip from one ffmpeg run that reads the source once (stream copies only)
+        self.single_pass = single_pass and stream_copy
+        # Stream copy remuxes the source packets instead of decoding/re-encoding
+        self.stream_copy = stream_copy
+        # Re-encode on the GPU/media engine when one is available (resolved in run)
+        self.use_hw_encoder = use_hw_encoder and not stream_copy
+        self.hw_encoder = None
+        # Each clip is an independent ffmpeg process, so run several at once
+        self.max_workers = max_workers or self.default_workers(stream_copy)
+        self._last_progress = 0.0
+    
+    @staticmethod
+    def default_workers(stream_copy):
+        """Pick how many FFmpeg processes to run at once
+        
+        Re-encoding is CPU-bound, so each process gets ENCODE_THREADS cores;
+        stream copies are disk-bound, where more than a few concurrent writers
+        only adds seeking.
+        """
+        cores = os.cpu_count() or 2
+        if stream_copy:
+            return max(1, min(cores // 2, 3))
+        return max(1, cores // ExportRunnable.ENCODE_THREADS)
+    
+    def _build_command(self, start, end, output_path, encoder=None):
+        """Build the FFmpeg command for a single clip, re-encoding with `encoder` if given"""
+        if self.stream_copy:
+            # Input-side seek (-ss before -i) jumps back to the keyframe at or
+            # before the seek point; seeking just past a snapped start makes sure
+            # a rounded-down timestamp still lands on that keyframe
+            seek = start + self.KEYFRAME_TOLERANCE
+            return [
+                'ffmpeg', '-y',  # Overwrite output files
+                '-ss', str(seek),  # Start time (fast input seek)
+                '-i', self.video_path,  # Input file
+                '-t', str(end - seek),  # Duration
+                '-c', 'copy',  # Remux only, no re-encode
+                '-avoid_negative_ts', 'make_zero',  # Fix timestamp issues
+                output_path
+            ]
+        
+        if encoder:
+            return [
+                'ffmpeg', '-y',  # Overwrite output files
+                '-ss', str(start),  # Start time (fast input seek)
+                '-i', self.video_path,  # Input file
+                '-t', str(end - start),  # Duration
+                '-c:v', encoder,  # Hardware video encoder
+                *HARDWARE_ENCODERS[encoder],
+                '-c:a', 'aac',  # Audio codec
+                '-avoid_negative_ts', 'make_zero',  # Fix timestamp issues
+                output_path
+            ]
+        
+        # Frame-accurate fallback: input seek is still exact when re-encoding
+        return [
+            'ffmpeg', '-y',  # Overwrite output files
+            '-ss', str(start),  # Start time (fast input seek)
+            '-i', self.video_path,  # Input file
+            '-t', str(end - start),  # Duration
+            '-c:v', 'libx264',  # Video codec
+            '-preset', 'fast',  # Fast encoding preset
+            '-crf', '23',  # Quality setting
+            '-threads', str(self.ENCODE_THREADS),  # Cap per-clip threads to avoid oversubscription
+            '-c:a', 'aac',  # Audio codec
+            '-avoid_negative_ts', 'make_zero',  # Fix timestamp issues
+            output_path
+        ]
+    
+    def _export_clip(self, index):
+        """Export one clip with FFmpeg (runs on a worker thread)"""
+        start, end, name = self.clips[index]
+        output_path = self.output_paths[index]
+        # Read once: other clips may downgrade the shared encoder meanwhile
+        encoder = self.hw_encoder
+        command = self._build_command(start, end, output_path, encoder)
+        try:
+            subprocess.run(command, capture_output=True, text=True, check=True)
+        except subprocess.CalledProcessError as e:
+            if not encoder:
+                raise
+            # The encoder is compiled in but the device is missing or busy;
+            # clips started from now on go straight to libx264
+            print(f"{encoder} failed, falling back to libx264: {e.stderr}")
+            self.hw_encoder = None
+            command = self._build_command(start, end, output_path)
+            subprocess.run(command, capture_output=True, text=True, check=True)
+        return name
         
     def run(self):
         """Export clips using direct FFmpeg (much faster than MoviePy)"""
         
-        # Get video info first
+        if not os.path.isfile(self.video_path):
+            self.signals.finished.emit(False, f"Could not open video: {self.video_path}")
+            return
+        
+        duration = self.video_meta.get('duration')
+        if duration:
+            self.clips = [(start, min(end, duration), name) for start, end, name in self.clips]
+        
+        if self.use_hw_encoder:
+            self.hw_encoder = detect_hardware_encoder()
+            if self.hw_encoder:
+                # Consumer GPUs only allow a few concurrent encode sessions
+                self.max_workers = min(self.max_workers, 3)
+        
+        if self.stream_copy:
+            self.clips, snapped = self._snap_to_keyframes(self.clips)
+            # One pass needs every start on a keyframe, and snapped starts move
+            # earlier so they may now overlap the previous clip
+            if self.single_pass and (not snapped or self.clips_overlap(self.clips)):
+                self.single_pass = False
+        
         try:
-            cap = cv2.VideoCapture(self.video_path)
-            if not cap.isOpened():
-                self.finished.emit(False, f"Could not open video: {self.video_path}")
-                return
-            
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            cap.release()
-            
-        except Exception as e:
-            self.finished.emit(False, f"Failed to read video info: {str(e)}")
+            if self.single_pass:
+                self._export_single_pass()
+            else:
+                self._export_parallel()
+        except ExportError as e:
+            self.signals.finished.emit(False, str(e))
             return
+                
+        self.signals.finished.emit(True, f"✅ All {len(self.clips)} clips exported successfully!\n\nLocation: {self.output_folder}")
+    
+    def _snap_to_keyframes(self, clips):
+        """Move each start back to the keyframe a stream copy really begins at
         
-        # Process each clip using direct FFmpeg (like auto-crop-ai.py)
-        for i, clip_info in enumerate(self.clips):
-            start, end, name = clip_info
-            self.progress.emit(i + 1, f"Exporting: {name} ({i+1}/{len(self.clips)})")
-            
-            output_path = os.path.join(self.output_folder, f"{name}.mp4")
+        Copied clips can only start on a keyframe; starting there explicitly
+        avoids frozen or missing frames at the head of each clip. Returns the
+        clips and whether the snap succeeded.
+        """
+        try:
+            keyframes = get_keyframe_times_cached(self.video_path)
+        except Exception as e:
+            print(f"Keyframe scan failed, exporting without snapping: {e}")
+            return clips, False
+        
+        if keyframes.size == 0:
+            return clips, False
+        
+        snapped = []
+        for start, end, name in clips:
+            index = bisect.bisect_right(keyframes, start) - 1
+            snapped.append((float(keyframes[index]) if index >= 0 else start, end, name))
+        return snapped, True
+    
+    def _export_parallel(self):
+        """Export each clip with its own FFmpeg process, several at a time"""
+        # The FFmpeg processes release the GIL while we wait on them
+        total = len(self.clips)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._export_clip, i): name
+                       for i, (_, _, name) in enumerate(self.clips)}
             
-            try:
-                # Use FFmpeg directly for maximum speed (like auto-crop-ai.py)
-                command = [
-                    'ffmpeg', '-y',  # Overwrite output files
-                    '-i', self.video_path,  # Input file
-                    '-ss', str(start),  # Start time
-                    '-t', str(end - start),  # Duration
-                    '-c:v', 'libx264',  # Video codec
-                    '-preset', 'fast',  # Fast encoding preset
-                    '-crf', '23',  # Quality setting
-                    '-c:a', 'aac',  # Audio codec
-                    '-avoid_negative_ts', 'make_zero',  # Fix timestamp issues
-                    output_path
-                ]
-                
-                # Run FFmpeg command
-                result = subprocess.run(
-                    command, 
-                    capture_output=True, 
-                    text=True, 
-                    check=True
-                )
+            for done, future in enumerate(as_completed(futures), 1):
+                name = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    # Cancel clips that have not started yet
+                    for pending in futures:
+                        pending.cancel()
+                    raise ExportError(self._describe_error(name, e)) from e
                 
-            except subprocess.CalledProcessError as e:
-                error_msg = f"FFmpeg failed for {name}:\n{e.stderr}"
-                self.finished.emit(False, error_msg)
-                return
-            except FileNotFoundError:
-                error_msg = (
-                    "FFmpeg not found! Please install FFmpeg:\n\n"
-                    "Windows: Download from https://ffmpeg.org/download.html\n"
-                    "Or use: winget install ffmpeg\n\n"
-                    "This method is much faster than MoviePy!"
-                )
-                self.finished.emit(False, error_msg)
-                return
-            except Exception as e:
-                self.finished.emit(False, f"Error processing {name}: {str(e)}")
-                return
-                
-        self.finished.emit(True, f"✅ All {len(self.clips)} clips exported successfully!\n\nLocation: {self.output_folder}")
+                self._report_progress(done, total, f"Exported: {name} ({done}/{total})")
+    
+    def _export_single_pass(self):
+        """Export all clips with a single FFmpeg run that reads the source once
+        
+        Each clip is its own output with output-side -ss/-t, so the copied
+        packets are cut at the exact end time rather than at a keyframe.
+        Starts must already be snapped to keyframes.
+        """
+        command = [
+            'ffmpeg', '-y',  # Overwrite output files
+            '-v', 'error',  # Only failures on stderr
+            '-i', self.video_path,  # Input file, read once for every clip
+        ]
+        for (start, end, _), output_path in zip(self.clips, self.output_paths):
+            command += [
+                # Output-side -ss drops packets before it, so stay just under
+                # the keyframe time in case the probed timestamp rounded up
+                '-ss', str(max(0.0, start - self.KEYFRAME_TOLERANCE)),
+                '-t', str(end - start),  # Duration
+                '-c', 'copy',  # Remux only, no re-encode
+                '-avoid_negative_ts', 'make_zero',  # Fix timestamp issues
+                output_path
+            ]
+        
+        # Outputs fill in timeline order, which is the order clips finish in
+        ordered_paths = [path for _, path in sorted(zip((start for start, _, _ in self.clips),
+                                                        self.output_paths))]
+        try:
+            self._run_with_progress(command, ordered_paths)
+        except Exception as e:
+            raise ExportError(self._describe_error("all clips", e)) from e
+    
+    def _run_with_progress(self, command, ordered_paths):
+        """Run FFmpeg, reporting a clip as done once the next clip's output has data
+        
+        Every output is fed from one sequential read of the source, so a later
+        clip receiving packets means every earlier clip has been written.
+        """
+        command = command[:1] + ['-progress', 'pipe:1', '-nostats'] + command[1:]
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   text=True)
+        total = len(ordered_paths)
+        self.signals.progress.emit(0, f"Splitting: 0/{total} clips")
+        done = 0
+        for line in process.stdout:
+            # One block of key=value lines per stats period, ending in progress=
+            if not line.startswith('progress='):
+                continue
+            while done < total - 1 and self._has_data(ordered_paths[done + 1]):
+                done += 1
+                self._report_progress(done, total, f"Splitting: {done}/{total} clips")
+        
+        stderr = process.stderr.read()
+        if process.wait() != 0:
+            raise subprocess.CalledProcessError(process.returncode, command, stderr=stderr)
+        self._report_progress(total, total, f"Exported {total}/{total} clips")
+    
+    @classmethod
+    def _has_data(cls, path):
+        """Check whether FFmpeg has written packets (not just a header) to an output"""
+        try:
+            return os.path.getsize(path) > cls.OUTPUT_HEADER_BYTES
+        except OSError:
+            return False
+    
+    def _report_progress(self, done, total, message):
+        """Emit progress at most every PROGRESS_INTERVAL seconds, plus the final step"""
+        now = time.monotonic()
+        if done < total and now - self._last_progress < self.PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        self.signals.progress.emit(done, message)
+    
+    @staticmethod
+    def _describe_error(name, error):
+        """Turn an export failure into a user-facing message"""
+        if isinstance(error, subprocess.CalledProcessError):
+            return f"FFmpeg failed for {name}:\n{error.stderr}"
+        if isinstance(error, FileNotFoundError) and error.filename == 'ffmpeg':
+            return (
+                "FFmpeg not found! Please install FFmpeg:\n\n"
+                "Windows: Download from https://ffmpeg.org/download.html\n"
+                "Or use: winget install ffmpeg\n\n"
+                "This method is much faster than MoviePy!"
+            )
+        return f"Error processing {name}: {str(error)}"
+    
+    @staticmethod
+    def clips_overlap(clips):
+        """Check whether any two clips share part of the timeline"""
+        return ExportRunnable.times_overlap([(start, end) for start, end, _ in clips])
+    
+    @staticmethod
+    def times_overlap(times):
+        """Check an (N, 2) array of start/end times for overlaps"""
+        times = np.asarray(times, dtype=np.float64).reshape(-1, 2)
+        ordered = times[np.argsort(times[:, 0], kind='stable')]
+        # Each start must come after every earlier-starting clip has ended
+        return bool(np.any(ordered[1:, 0] < np.maximum.accumulate(ordered[:-1, 1])))
 
 
 class ClipGenerator:
@@ -91,49 +321,35 @@ class ClipGenerator:
     @staticmethod
     def generate_overlapping_clips(video_duration, num_clips, duration):
         """Generate random clips that can overlap"""
-        import random
-        
-        clips = []
         max_start = video_duration - duration
         
         if max_start <= 0:
-            return clips
-        
-        for i in range(num_clips):
-            start = random.uniform(0, max_start)
-            end = start + duration
-            clips.append((start, end, ""))
+            return []
         
-        clips.sort(key=lambda x: x[0])
-        return clips
+        # Draw and sort every start in one NumPy pass
+        starts = np.sort(np.random.default_rng().uniform(0, max_start, size=num_clips))
+        ends = starts + duration
+        return list(zip(starts.tolist(), ends.tolist(), [""] * num_clips))
     
     @staticmethod
     def generate_non_overlapping_clips(video_duration, num_clips, duration):
-        """Generate random non-overlapping clips"""
+        """Generate random non-overlapping clips
+        
+        The timeline is split into equal slots that each fit one clip; a random
+        sample of slots is taken and each clip is placed at a random offset
+        inside its slot, so no overlap check or retry loop is needed.
+        """
         import random
         
-        clips = []
-        max_attempts = num_clips * 20
-        attempts = 0
+        if duration <= 0 or video_duration - duration <= 0:
+            return []
         
-        while len(clips) < num_clips and attempts < max_attempts:
-            attempts += 1
-            
-            max_start = video_duration - duration
-            if max_start <= 0:
-                break
-                
-            start = random.uniform(0, max_start)
-            end = start + duration
-            
-            overlaps = False
-            for existing_start, existing_end, _ in clips:
-                if not (end <= existing_start or start >= existing_end):
-                    overlaps = True
-                    break
-            
-            if not overlaps:
-                clips.append((start, end, ""))
+        max_slots = int(video_duration // duration)
+        slot_width = video_duration / max_slots
+        
+        clips = []
+        for slot in sorted(random.sample(range(max_slots), min(num_clips, max_slots))):
+            start = slot * slot_width + random.uniform(0, slot_width - duration)
+            clips.append((start, start + duration, ""))
         
-        clips.sort(key=lambda x: x[0])
-        return clips
\ No newline at end of file
+        return clips
@@ -0,0 +1,27 @@
+"""
+Background probing of video metadata so the UI thread never blocks on ffmpeg
+"""
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from utils import get_video_metadata_cached
+
+
+class ProbeSignals(QObject):
+    """Signals emitted by ProbeRunnable"""
+    finished = pyqtSignal(str, object, str)  # file_path, metadata dict, error
+
+
+class ProbeRunnable(QRunnable):
+    """Thread pool task for reading basic video information"""
+
+    def __init__(self, file_path):
+        super().__init__()
+        self.signals = ProbeSignals()
+        self.file_path = file_path
+
+    def run(self):
+        try:
+            metadata = get_video_metadata_cached(self.file_path)
+            self.signals.finished.emit(self.file_path, metadata, "")
+        except Exception as e:
+            self.signals.finished.emit(self.file_path, {}, str(e))